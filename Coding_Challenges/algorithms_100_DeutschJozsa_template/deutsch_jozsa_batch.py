@@ -0,0 +1,85 @@
+#! /usr/bin/python3
+
+"""Classifies Deutsch Jozsa oracles streamed on stdin, one specification per line.
+
+A line is either the challenge input, the control wires of CNOTs onto wire 2 (e.g. "0,1"), or gates
+separated by semicolons (e.g. "PauliX:2;CNOT:0,2;Toffoli:0,1,2").
+
+Usage:
+    python deutsch_jozsa_batch.py [--method auto|classical|quantum] [--check] < oracles.txt
+    python deutsch_jozsa_batch.py --self-check
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from deutsch_jozsa_jbus import classify_stream, cross_check
+
+# Oracles with a known verdict, checked on both paths next to the challenge fixtures.
+KNOWN_ORACLES = {
+    "PauliX:2": "constant",
+    "PauliX:2;PauliX:2": "constant",
+    "0": "balanced",
+    "1": "balanced",
+    "0,1": "balanced",
+    "PauliX:2;CNOT:1,2": "balanced",
+    "PauliX:0;CNOT:0,2;PauliX:0": "balanced",
+}
+
+
+def self_check():
+    """Classifies the challenge fixtures and KNOWN_ORACLES with the truth table and with the circuit.
+
+    Returns:
+        - (list(str)): a description of every failure, empty if both paths give the expected verdicts
+    """
+    here = Path(__file__).resolve().parent
+    expected = dict(KNOWN_ORACLES)
+    for fixture_in in sorted(here.glob("*.in")):
+        expected[fixture_in.read_text().strip()] = fixture_in.with_suffix(".ans").read_text().strip()
+
+    failures = []
+    for spec, classical, quantum in cross_check(list(expected)):
+        failures.append(f"{spec}: classical {classical}, quantum {quantum}")
+    for method in ("classical", "quantum"):
+        for (spec, want), got in zip(expected.items(), classify_stream(expected, method)):
+            if got != want:
+                failures.append(f"{spec}: {method} {got}, expected {want}")
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--method", default="auto", choices=["auto", "classical", "quantum"])
+    parser.add_argument(
+        "--check", action="store_true", help="run the truth table and the circuit on every oracle and report disagreements"
+    )
+    parser.add_argument(
+        "--self-check", action="store_true", help="check both methods on the challenge fixtures and known oracles"
+    )
+    args = parser.parse_args(argv)
+
+    if args.self_check:
+        failures = self_check()
+        for failure in failures:
+            print(failure)
+        print("self-check " + ("failed" if failures else "passed"))
+        return 1 if failures else 0
+
+    if args.check:
+        specs = [line for line in sys.stdin if line.strip()]
+        mismatches = cross_check(specs)
+        for spec, classical, quantum in mismatches:
+            print(f"{spec.strip()}: classical {classical}, quantum {quantum}")
+        print(f"{len(specs) - len(mismatches)}/{len(specs)} oracles agree")
+        return 1 if mismatches else 0
+
+    for verdict in classify_stream(sys.stdin, args.method):
+        print(verdict)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,113 @@ import sys
 import pennylane as qml
 from pennylane import numpy as np
 
-def deutsch_jozsa(oracle):
+# Gates that map basis states to basis states
+CLASSICAL_GATES = {"PauliX", "CNOT", "Toffoli"}
+
+
+def record_oracle(oracle):
+    """Lists the gates of an oracle.
+
+    Args:
+        - oracle (function): quantum function without arguments
+
+    Returns:
+        - (list(tuple(str, tuple(int)))): name and wires of every gate, or None if the oracle uses
+        gates outside CLASSICAL_GATES
+    """
+    with qml.tape.QuantumTape() as tape:
+        oracle()
+
+    gates = []
+    for op in tape.operations:
+        if op.name not in CLASSICAL_GATES:
+            return None
+        gates.append((op.name, tuple(op.wires.labels)))
+
+    return gates
+
+
+def truth_table(gates, n=3):
+    """Runs a circuit of X, CNOT and Toffoli gates on every basis state at once. Each wire is held as an
+    integer whose bit k is the value of the wire for the basis state k, so every gate is one bitwise operation.
+
+    Args:
+        - gates (list(tuple(str, tuple(int)))): name and wires of every gate
+        - n (int): number of wires, the last one being the output of the oracle
+
+    Returns:
+        - (int): the truth table of f, bit x being f(x) for the input wires reading x (wire 0 most significant),
+        or None if the circuit is not of the form |x>|y> -> |x>|y + f(x)>
+    """
+    rows = 2 ** n
+    full = (1 << rows) - 1
+    # wire w reads bit n - 1 - w of the basis state
+    planes = [sum(1 << k for k in range(rows) if (k >> (n - 1 - w)) & 1) for w in range(n)]
+    inputs = list(planes)
+
+    for name, wires in gates:
+        if name == "PauliX":
+            planes[wires[0]] ^= full
+        elif name == "CNOT":
+            planes[wires[1]] ^= planes[wires[0]]
+        else:
+            planes[wires[2]] ^= planes[wires[0]] & planes[wires[1]]
+
+    # the output wire is the least significant bit: rows 2x and 2x + 1 share the input x
+    f = planes[-1] ^ inputs[-1]
+    even_rows = full // 3
+    if planes[:-1] != inputs[:-1] or ((f >> 1) ^ f) & even_rows:
+        return None
+
+    # keep the rows where the output wire starts in 0
+    table = 0
+    for x in range(rows // 2):
+        table |= ((f >> (2 * x)) & 1) << x
+
+    return table
+
+
+def classify_truth_table(table, n=3):
+    """Tells constant from balanced truth tables.
+
+    Args:
+        - table (int): truth table of `truth_table`
+        - n (int): number of wires of the oracle
+
+    Returns:
+        - (str): "constant" or "balanced", or None if f is neither
+    """
+    rows = 2 ** (n - 1)
+    ones = bin(table).count("1")
+    if ones in (0, rows):
+        return 'constant'
+    if 2 * ones == rows:
+        return 'balanced'
+    return None
+
+
+def deutsch_jozsa(oracle, method="auto"):
     """This function will determine whether an oracle defined by a function f is constant or balanced.
 
     Args:
         - oracle (function): Encoding of the f function as a quantum gate. The first two qubits refer to the input and the third to the output.
+        - method (str): "quantum" runs the Deutsch Jozsa circuit, "classical" evaluates the truth table of
+        oracles made of X, CNOT and Toffoli gates, "auto" uses the truth table when it can and the circuit otherwise
 
     Returns:
         - (str): "constant" or "balanced"
     """
     n = 3
+
+    if method != "quantum":
+        gates = record_oracle(oracle)
+        table = truth_table(gates, n) if gates is not None else None
+        verdict = classify_truth_table(table, n) if table is not None else None
+        if verdict is not None:
+            return verdict
+        if method == "classical":
+            raise ValueError("The oracle is not a constant or balanced circuit of X, CNOT and Toffoli gates")
+
     dev = qml.device("default.qubit", wires=n, shots=1)
 
     @qml.qnode(dev)
@@ -37,6 +134,84 @@ def deutsch_jozsa(oracle):
     return 'constant' if np.sum(sample) == 0 else 'balanced'
 
 
+def parse_oracle(spec):
+    """Reads an oracle specification: either the challenge input, the control wires of CNOTs onto wire 2
+    (e.g. "0,1"), or gates separated by semicolons (e.g. "PauliX:2;CNOT:0,2;Toffoli:0,1,2").
+
+    Args:
+        - spec (str): one oracle specification
+
+    Returns:
+        - (list(tuple(str, tuple(int)))): name and wires of every gate
+    """
+    spec = spec.strip()
+    if ":" not in spec:
+        return [("CNOT", (int(i), 2)) for i in spec.split(",") if i.strip()]
+
+    gates = []
+    for gate in spec.split(";"):
+        name, wires = gate.split(":")
+        gates.append((name.strip(), tuple(int(w) for w in wires.split(","))))
+
+    return gates
+
+
+def oracle_from_gates(gates):
+    """Turns a gate list back into an oracle.
+
+    Args:
+        - gates (list(tuple(str, tuple(int)))): name and wires of every gate
+
+    Returns:
+        - (function): quantum function applying the gates
+    """
+    def oracle():
+        for name, wires in gates:
+            getattr(qml, name)(wires=list(wires))
+
+    return oracle
+
+
+def classify_stream(lines, method="auto"):
+    """Classifies a stream of oracle specifications, one per line, as they are read.
+
+    Args:
+        - lines (iterable(str)): oracle specifications, see `parse_oracle`. Blank lines are skipped.
+        - method (str): method of `deutsch_jozsa`
+
+    Returns:
+        - (generator(str)): "constant" or "balanced" for every oracle
+    """
+    for line in lines:
+        if line.strip():
+            yield deutsch_jozsa(oracle_from_gates(parse_oracle(line)), method)
+
+
+def cross_check(specs):
+    """Runs the truth table and the quantum circuit on the same oracles.
+
+    Args:
+        - specs (list(str)): oracle specifications, see `parse_oracle`
+
+    Returns:
+        - (list(tuple(str, str, str))): specification, classical and quantum verdicts of every oracle
+        on which the two disagree. The classical verdict is "unclassifiable" for oracles that the truth
+        table finds neither constant nor balanced, or that use other gates than X, CNOT and Toffoli.
+    """
+    mismatches = []
+    for spec in specs:
+        oracle = oracle_from_gates(parse_oracle(spec))
+        try:
+            classical = deutsch_jozsa(oracle, "classical")
+        except ValueError:
+            classical = "unclassifiable"
+        quantum = deutsch_jozsa(oracle, "quantum")
+        if classical != quantum:
+            mismatches.append((spec, classical, quantum))
+
+    return mismatches
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
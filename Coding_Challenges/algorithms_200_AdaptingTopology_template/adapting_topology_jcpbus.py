@@ -1,9 +1,9 @@
 #! /usr/bin/python3
 
 import sys
+import functools
 from pennylane import numpy as np
 import pennylane as qml
-import networkx as nx
 
 graph = {
     0: [1],
@@ -17,26 +17,125 @@ graph = {
     8: [4],
 }
 
-def n_swaps(cnot):
+def load_coupling_map(path):
+    """Reads a hardware graph from an edge-list file: one pair of connected qubits per line, separated
+    by a space or a comma. Anything after a '#' is a comment.
+
+    Args:
+        - path (str): edge-list file
+
+    Returns:
+        - (dict(int, list(int))): neighbors of every qubit, in the format of `graph`
+    """
+
+    coupling_map = {}
+    with open(path) as f:
+        for line in f:
+            line = line.split("#")[0].replace(",", " ").split()
+            if not line:
+                continue
+            u, v = int(line[0]), int(line[1])
+            coupling_map.setdefault(u, []).append(v)
+            coupling_map.setdefault(v, []).append(u)
+
+    return coupling_map
+
+
+def distance_table(coupling_map):
+    """Shortest path lengths between all pairs of qubits, from a breadth-first search run from every
+    qubit at once: row s of the frontier holds the qubits reached from s at the current distance.
+
+    Args:
+        - coupling_map (dict(int, list(int))): neighbors of every qubit, qubits being labelled 0, 1, ...
+
+    Returns:
+        - (np.ndarray): table of shape (n, n), entry (i, j) is the distance between qubits i and j,
+        -1 if they are not connected
+    """
+
+    n = max(max([u] + list(vs)) for u, vs in coupling_map.items()) + 1
+    max_degree = max([len(vs) for vs in coupling_map.values()] + [1])
+
+    # neighbors of every qubit, padded with the qubit itself
+    neighbors = np.tile(np.arange(n)[:, None], (1, max_degree))
+    for u, vs in coupling_map.items():
+        neighbors[u, : len(vs)] = vs
+
+    distances = np.full((n, n), -1, dtype=int)
+    np.fill_diagonal(distances, 0)
+    reached = np.eye(n, dtype=bool)
+    frontier = reached.copy()
+
+    distance = 0
+    while frontier.any():
+        distance += 1
+        # v is reached from s if one of the neighbors of v was in the frontier of s
+        frontier = frontier[:, neighbors].any(axis=2) & ~reached
+        distances[frontier] = distance
+        reached |= frontier
+
+    return np.array(distances, requires_grad=False)
+
+
+@functools.lru_cache(maxsize=None)
+def default_distances():
+    """Distance table of `graph`, computed once."""
+
+    return distance_table(graph)
+
+
+def n_swaps_batch(pairs, distances=None):
+    """Vectorised `n_swaps`: swap counts of many CNOTs in one table lookup.
+
+    Args:
+        - pairs (np.ndarray): array of shape (m, 2) with the control and target of every CNOT
+        - distances (np.ndarray): table of `distance_table`, the one of `graph` by default
+
+    Returns:
+        - (np.ndarray): minimum number of swaps for every CNOT
+    """
+
+    if distances is None:
+        distances = default_distances()
+
+    pairs = np.reshape(np.array(pairs, dtype=int, requires_grad=False), (-1, 2))
+    lengths = distances[pairs[:, 0], pairs[:, 1]]
+    if np.any(lengths < 0):
+        raise ValueError("Some CNOTs act on qubits that are not connected")
+
+    # move the control next to the target and back
+    return (lengths - 1) * 2
+
+
+def cnot_pairs(operations):
+    """Control and target of the CNOTs of a circuit.
+
+    Args:
+        - operations (list(qml.Operation)): operations of the circuit, e.g. tape.operations
+
+    Returns:
+        - (np.ndarray): array of shape (m, 2), one row per CNOT
+    """
+
+    pairs = [op.wires.labels for op in operations if op.name == "CNOT"]
+
+    return np.reshape(np.array(pairs, dtype=int, requires_grad=False), (-1, 2))
+
+
+def n_swaps(cnot, distances=None):
     """Count the minimum number of swaps needed to create the equivalent CNOT.
 
     Args:
         - cnot (qml.Operation): A CNOT gate that needs to be implemented on the hardware
         You can find out the wires on which an operator works by asking for the 'wires' attribute: 'cnot.wires'
+        - distances (np.ndarray): table of `distance_table`, the one of `graph` by default
 
     Returns:
         - (int): minimum number of swaps
     """
 
     # QHACK #
-
-    i,j = cnot.wires
-
-    G = nx.Graph(graph)
-    path = nx.all_pairs_shortest_path_length(G) # This is a generator
-    dpath = {x[0]:x[1] for x in path}
-
-    return (dpath[i][j] - 1)*2
+    return int(n_swaps_batch([cnot.wires.labels], distances)[0])
     # QHACK #
 
 
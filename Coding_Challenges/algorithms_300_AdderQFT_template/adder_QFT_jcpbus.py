@@ -3,7 +3,23 @@
 import sys
 from pennylane import numpy as np
 import pennylane as qml
-import matplotlib.pyplot as plt
+
+
+def adder_phases(m, n_wires):
+    """Phases added to every wire by `qfunc_adder`, as exact fractions of a full turn.
+
+    After the QFT, wire i (wire 0 being the most significant bit) holds |0> + exp(2 pi i x / 2^(i + 1))|1>,
+    so adding m turns the phase of wire i by m / 2^(i + 1).
+
+    Args:
+        - m (int): units to add.
+        - n_wires (int): number of wires
+
+    Returns:
+        - (list(int)): numerator of the phase of wire i, the denominator being 2^(i + 1)
+    """
+
+    return [m % 2 ** (i + 1) for i in range(n_wires)]
 
 
 def qfunc_adder(m, wires):
@@ -17,21 +33,81 @@ def qfunc_adder(m, wires):
     qml.QFT(wires=wires)
 
     # QHACK #
-    N = len(wires)
-    m_binary = [int(x) for x in np.binary_repr(m)]  # binary representation of m
-    m_binary = [0] * (N - len(m_binary)) + m_binary  # pad with zeros
-
-    print("m_binary: ", m_binary)
-
-    for i, x in enumerate(m_binary):
-        phase = (np.pi) * (m / 2 ** (i))
-        print(i, x, phase / (2 * np.pi))
-        qml.RZ(phase, wires=0)
+    for i, numerator in enumerate(adder_phases(m, len(wires))):
+        if numerator:
+            qml.RZ(2 * np.pi * numerator / 2 ** (i + 1), wires=wires[i])
 
     # QHACK #
     qml.QFT(wires=wires).inv()
 
 
+def fourier_adder(m, x, n_wires):
+    """Classical simulation of `qfunc_adder` on the basis state |x>, exact for any number of wires.
+
+    The QFT of a basis state is a product state, so it is tracked as one phase per wire, stored as the
+    integer numerator of a fraction of a turn. The adder turns every phase and the inverse QFT reads
+    bit i of the result off the phase of wire n_wires - 1 - i.
+
+    Args:
+        - m (int): units to add.
+        - x (int): input basis state, wire 0 being the most significant bit
+        - n_wires (int): number of wires
+
+    Returns:
+        - (list(int)): bits of the output basis state, wire 0 first
+    """
+
+    phases = [x % 2 ** (i + 1) for i in range(n_wires)]
+    for i, numerator in enumerate(adder_phases(m, n_wires)):
+        phases[i] = (phases[i] + numerator) % 2 ** (i + 1)
+
+    # phase i is y / 2^(i + 1) mod 1, its leading bit is bit i of y
+    return [(phases[n_wires - 1 - i] >> (n_wires - 1 - i)) & 1 for i in range(n_wires)]
+
+
+def state_vector_adder(m, x, n_wires):
+    """Runs `qfunc_adder` on the basis state |x> on `default.qubit`.
+
+    Args:
+        - m (int): units to add.
+        - x (int): input basis state, wire 0 being the most significant bit
+        - n_wires (int): number of wires
+
+    Returns:
+        - (list(int)): bits of the most likely output basis state, wire 0 first
+    """
+
+    dev = qml.device("default.qubit", wires=n_wires)
+
+    @qml.qnode(dev)
+    def circuit():
+        qml.BasisState(np.array([int(b) for b in np.binary_repr(x, n_wires)]), wires=range(n_wires))
+        qfunc_adder(m, range(n_wires))
+        return qml.probs(wires=range(n_wires))
+
+    return [int(b) for b in np.binary_repr(int(np.argmax(circuit())), n_wires)]
+
+
+def cross_validate(max_wires=4):
+    """Compares `fourier_adder` with the state vector simulation for every m and input on up to max_wires wires.
+
+    Args:
+        - max_wires (int): largest number of wires to check
+
+    Returns:
+        - (list(tuple(int))): (n_wires, m, x) of every disagreement
+    """
+
+    mismatches = []
+    for n_wires in range(1, max_wires + 1):
+        for m in range(2 ** n_wires):
+            for x in range(2 ** n_wires):
+                if fourier_adder(m, x, n_wires) != state_vector_adder(m, x, n_wires):
+                    mismatches.append((n_wires, m, x))
+
+    return mismatches
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
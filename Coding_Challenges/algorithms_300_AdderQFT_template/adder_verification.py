@@ -0,0 +1,46 @@
+#! /usr/bin/python3
+
+"""Checks the QFT adder on random basis states against modular addition, on any number of wires.
+
+Wide adders are simulated classically by tracking the Fourier phases of every wire; the classical
+simulation itself is first compared with the state vector simulation on small widths.
+
+Usage:
+    python adder_verification.py [--wires 64] [--trials 1000] [--seed 0] [--max-wires 4]
+"""
+
+import argparse
+import random
+import sys
+
+from adder_QFT_jcpbus import cross_validate, fourier_adder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wires", type=int, default=64, help="width of the adders to check")
+    parser.add_argument("--trials", type=int, default=1000, help="number of random (m, x) pairs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--max-wires", type=int, default=4, help="compare with the state vector simulation up to this width"
+    )
+    args = parser.parse_args(argv)
+
+    mismatches = cross_validate(args.max_wires)
+    for n_wires, m, x in mismatches:
+        print(f"{n_wires} wires: {x} + {m} differs from the state vector simulation")
+    print(f"state vector cross-validation up to {args.max_wires} wires: {len(mismatches)} mismatches")
+
+    rng = random.Random(args.seed)
+    failures = 0
+    for _ in range(args.trials):
+        m, x = rng.getrandbits(args.wires), rng.getrandbits(args.wires)
+        expected = [int(b) for b in format((x + m) % 2 ** args.wires, f"0{args.wires}b")]
+        failures += fourier_adder(m, x, args.wires) != expected
+    print(f"{args.trials - failures}/{args.trials} additions on {args.wires} wires correct")
+
+    return 1 if mismatches or failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
 #! /usr/bin/python3
 
 import sys
+import os
+import glob
+import functools
 import pennylane as qml
 from pennylane import numpy as np
 from pennylane.templates import QuantumPhaseEstimation
@@ -20,16 +23,29 @@ def oracle_matrix(indices):
     """
 
     # QHACK #
-    my_array = np.identity(2 ** 4)
-
-    for i in indices:
-        my_array[i][i] = -1
-
+    my_array = np.diag(oracle_signs(indices))
     # QHACK #
 
     return my_array
 
 
+def oracle_signs(indices, n_wires=4):
+    """Diagonal of the oracle: the oracle only flips the sign of the marked elements.
+
+    Args:
+        - indices (list(int)): A list of bit indices (e.g. [0,3]) representing the elements that are map to 1.
+        - n_wires (int): number of search wires
+
+    Returns:
+        - (np.ndarray): +1 for unmarked elements and -1 for marked ones
+    """
+
+    signs = np.ones(2 ** n_wires, requires_grad=False)
+    signs[list(indices)] = -1
+
+    return signs
+
+
 def diffusion_matrix():
 
     # DO NOT MODIFY anything in this code block
@@ -46,6 +62,61 @@ def grover_operator(indices):
     return np.dot(diffusion_matrix(), oracle_matrix(indices))
 
 
+@functools.lru_cache(maxsize=None)
+def grover_eigendecomposition(indices):
+    """Eigendecomposition of `grover_operator`, computed once per set of marked elements. The diffusion
+    is applied to the oracle by scaling its columns with the oracle signs, with no matrix product.
+
+    Args:
+        - indices (tuple(int)): the marked elements, as a tuple so that they can be cached
+
+    Returns:
+        - (np.ndarray): eigenvalues of the Grover operator
+        - (np.ndarray): its eigenvectors, as columns
+        - (np.ndarray): the inverse of the eigenvector matrix
+    """
+
+    grover = diffusion_matrix() * oracle_signs(indices)[None, :]
+    eigenvalues, eigenvectors = np.linalg.eig(grover)
+
+    return eigenvalues, eigenvectors, np.linalg.inv(eigenvectors)
+
+
+@functools.lru_cache(maxsize=None)
+def grover_power(indices, power):
+    """The Grover operator raised to some power, from its cached eigendecomposition.
+
+    Args:
+        - indices (tuple(int)): the marked elements
+        - power (int): exponent
+
+    Returns:
+        - (np.ndarray): matrix of grover_operator(indices) ** power
+    """
+
+    eigenvalues, eigenvectors, inverse = grover_eigendecomposition(indices)
+    matrix = (eigenvectors * eigenvalues ** power) @ inverse
+
+    # the Grover operator is real, so are its powers
+    return np.real_if_close(matrix, tol=1e6)
+
+
+def phase_estimation(indices, target_wires, estimation_wires):
+    """Applies the controlled powers of the Grover operator of phase estimation, as one controlled
+    unitary per estimation wire: estimation wire i controls U ** (2 ** (len(estimation_wires) - 1 - i)).
+
+    Args:
+        - indices (list(int)): A list of bits representing the elements that map to 1.
+        - target_wires (list(int)): the search wires
+        - estimation_wires (list(int)): the estimation wires, most significant first
+    """
+
+    t = len(estimation_wires)
+    for i, w in enumerate(estimation_wires):
+        power = grover_power(tuple(sorted(indices)), 2 ** (t - 1 - i))
+        qml.ControlledQubitUnitary(power, wires=target_wires, control_wires=w)
+
+
 dev = qml.device("default.qubit", wires=8)
 
 
@@ -67,18 +138,13 @@ def circuit(indices):
     estimation_wires = [4, 5, 6, 7]
 
     wires = target_wires + estimation_wires
-    n = 4
 
     # Build your circuit here
 
     for w in wires:
         qml.Hadamard(wires=w)
 
-    for i, w in enumerate(estimation_wires):
-        for j in range(2 ** (n - 1 - i)):
-            qml.ControlledQubitUnitary(
-                grover_operator(indices), wires=target_wires, control_wires=w
-            )
+    phase_estimation(indices, target_wires, estimation_wires)
 
     qml.QFT(wires=estimation_wires).inv()
     # QHACK #
@@ -86,23 +152,104 @@ def circuit(indices):
     return qml.probs(estimation_wires)
 
 
-def number_of_solutions(indices):
+def counting_distribution(n_marked, n_search=4, n_estimation=4):
+    """Closed-form distribution of the estimation register of `circuit`, for any register sizes.
+
+    The uniform superposition lies in the plane where the Grover operator is a rotation by theta,
+    sin(theta / 2) ** 2 = n_marked / 2 ** n_search, and has weight 1/2 on each of its eigenvectors of
+    eigenphases +theta and -theta. Phase estimation of an eigenphase 2 pi phi with t wires gives j with
+    probability |sum_k exp(2 pi i k (phi - j / 2 ** t))| ** 2 / 4 ** t.
+
+    Args:
+        - n_marked (int): number of elements that map to 1
+        - n_search (int): number of search wires
+        - n_estimation (int): number of estimation wires
+
+    Returns:
+        - (np.ndarray): probability of each of the 2 ** n_estimation outcomes
+    """
+
+    size = 2 ** n_estimation
+    theta = 2 * np.arcsin(np.sqrt(n_marked / 2 ** n_search))
+    outcomes = np.arange(size)
+
+    probs = np.zeros(size)
+    for phi in (theta / (2 * np.pi), -theta / (2 * np.pi)):
+        delta = phi - outcomes / size
+        numerator = np.sin(np.pi * size * delta)
+        denominator = size * np.sin(np.pi * delta)
+        # delta is an integer: every term of the sum is 1
+        exact = np.isclose(np.round(delta), delta, rtol=0, atol=1e-12)
+        probs += 0.5 * np.where(exact, 1.0, (numerator / np.where(exact, 1.0, denominator)) ** 2)
+
+    return probs
+
+
+def cross_validate(index_sets=None, atol=1e-8):
+    """Compares `counting_distribution` with the simulation of `circuit`.
+
+    Args:
+        - index_sets (list(list(int))): marked elements of every case to check. By default the indices of
+        the N.in fixtures next to this file, and range(n_marked) for every n_marked from 0 to 16.
+        - atol (float): largest difference accepted between two probabilities
+
+    Returns:
+        - (list(tuple(int))): marked elements of every case on which the two distributions differ
+    """
+
+    if index_sets is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        index_sets = []
+        for fixture in sorted(glob.glob(os.path.join(here, "*.in"))):
+            with open(fixture) as f:
+                index_sets.append([int(i) for i in f.read().split(",")])
+        index_sets += [list(range(n_marked)) for n_marked in range(2 ** 4 + 1)]
+
+    mismatches = []
+    for indices in index_sets:
+        simulated = circuit(indices)
+        closed_form = counting_distribution(len(set(indices)))
+        if not np.allclose(simulated, closed_form, rtol=0, atol=atol):
+            mismatches.append(tuple(indices))
+
+    return mismatches
+
+
+def estimate_solutions(probs, n_search=4):
+    """Applies the formula of the problem statement to the most likely outcome of phase estimation.
+
+    Args:
+        - probs (np.ndarray): distribution of the estimation register
+        - n_search (int): number of search wires
+
+    Returns:
+        - (float): estimated number of elements that map to 1
+    """
+
+    theta = np.argmax(probs) * 2 * np.pi / len(probs)
+
+    return 2 ** n_search * (np.sin(theta / 2)) ** 2
+
+
+def number_of_solutions(indices, analytic=False):
     """Implement the formula given in the problem statement to find the number of solutions from the output of your circuit
 
     Args:
         - indices (list(int)): A list of bits representing the elements that map to 1.
+        - analytic (bool): take the distribution of the estimation register from `counting_distribution`
+        instead of simulating `circuit`
 
     Returns:
         - (float): number of elements as estimated by the quantum counting algorithm
     """
 
     # QHACK #
-    probs = circuit(indices)
-    index_of_max_prob = np.argmax(probs)
-
-    theta = index_of_max_prob * np.pi / 8
+    if analytic:
+        probs = counting_distribution(len(set(indices)))
+    else:
+        probs = circuit(indices)
 
-    M = 16 * (np.sin(theta / 2)) ** 2
+    M = estimate_solutions(probs)
 
     return M
     # QHACK #
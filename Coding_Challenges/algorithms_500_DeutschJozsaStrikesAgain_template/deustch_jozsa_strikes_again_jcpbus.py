@@ -1,82 +1,195 @@
 #! /usr/bin/python3
 
 import sys
+import functools
 from pennylane import numpy as np
 import pennylane as qml
 
 
-def deutsch_jozsa(fs):
-    """Function that determines whether four given functions are all of the same type or not.
+class RecordedOracle:
+    """Gates of an oracle on wires 0, 1 and 2, compared and hashed by their `key`, the (name, wires,
+    parameters) of every gate in order, so that the unitary can be cached with `functools.lru_cache`.
 
     Args:
-        - fs (list(function)): A list of 4 quantum functions. Each of them will accept a 'wires' parameter.
-        The first two wires refer to the input and the third to the output of the function.
+        - operations (list(qml.Operation)): the recorded gates
+    """
+
+    def __init__(self, operations):
+        self.operations = operations
+        # parameters may be arrays (e.g. QubitUnitary), so they are keyed on their bytes
+        self.key = tuple(
+            (
+                op.name,
+                tuple(op.wires.labels),
+                tuple((np.asarray(p).dtype.str, np.shape(p), np.asarray(p).tobytes()) for p in op.parameters),
+            )
+            for op in operations
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, RecordedOracle) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+def record_oracle(f):
+    """Records an oracle on wires 0, 1 and 2.
+
+    Args:
+        - f (function): quantum function accepting a 'wires' parameter
 
     Returns:
-        - (str) : "4 same" or "2 and 2"
+        - (RecordedOracle): its gates
     """
 
-    # QHACK #
-    wires = range(6)
-    dev = qml.device("default.qubit", wires=wires, shots=1)
+    with qml.tape.QuantumTape() as tape:
+        f(wires=[0, 1, 2])
+
+    return RecordedOracle(tape.operations)
+
 
-    def binary_string(x):
-        # converts a number to a binary string
-        x_bin = bin(x)[2:]
+@functools.lru_cache(maxsize=256)
+def recorded_unitary(oracle):
+    """Matrix of a recorded oracle, computed once per distinct gate sequence.
 
-        # pad with zeros to length 2
-        x_bin = x_bin.zfill(2)
+    Args:
+        - oracle (RecordedOracle): gates of the oracle
 
-        return x_bin
+    Returns:
+        - (np.ndarray): 8x8 matrix of the oracle
+    """
 
-    def unitary_matrix(f):
-        wires = range(3)
+    if not oracle.operations:
+        return np.eye(8, dtype=complex, requires_grad=False)
 
-        def f_extended(f):
-            f(wires=wires)
-            for w in wires:
-                qml.Identity(wires=w)
+    def replay():
+        for op in oracle.operations:
+            qml.apply(op)
 
-        get_matrix = qml.transforms.get_unitary_matrix(f_extended)
-        return get_matrix(f)
+    return qml.transforms.get_unitary_matrix(replay, wire_order=[0, 1, 2])()
 
-    # global Deutsch Jozsa
-    @qml.qnode(dev)
-    def deutsch_jozsa_new(fs):
-        qml.PauliX(wires=2)
-        qml.PauliX(wires=5)
 
-        for w in wires:
+def oracle_unitary(f):
+    """Matrix of an oracle on wires 0, 1 and 2, see `recorded_unitary`.
+
+    Args:
+        - f (function): quantum function accepting a 'wires' parameter
+
+    Returns:
+        - (tuple): the gate sequence of the oracle, see `RecordedOracle.key`
+        - (np.ndarray): 8x8 matrix of the oracle
+    """
+
+    oracle = record_oracle(f)
+
+    return oracle.key, recorded_unitary(oracle)
+
+
+@functools.lru_cache(maxsize=None)
+def deutsch_jozsa_qnode():
+    """Builds the device and the QNode of the global Deutsch-Jozsa circuit once.
+
+    Wires 0 and 1 hold the index i of the oracle, wires 2 and 3 its input x, wire 4 its output and
+    wire 5 the output of the oracle of the outer Deutsch-Jozsa algorithm, t_i = 1 if f_i is constant.
+    t_i is obtained by running Deutsch-Jozsa on f_i, kicking back a phase when x reads 00 (f_i constant),
+    and running it again to return x to |00>, so that each |i> only picks up the phase (-1) ** t_i.
+
+    Returns:
+        - (qml.QNode): takes the four oracle unitaries and returns one sample of wires 0 and 1
+    """
+
+    index_wires = [0, 1]
+    input_wires = [2, 3]
+    dev = qml.device("default.qubit", wires=6, shots=1)
+
+    def controlled_oracles(unitaries):
+        for w in input_wires:
             qml.Hadamard(w)
 
-        for i, f in enumerate(fs):
-            control_values = binary_string(i)
+        for i, unitary in enumerate(unitaries):
+            # control values: i as a binary string of length 2
+            control_values = bin(i)[2:].zfill(2)
 
             qml.ControlledQubitUnitary(
-                unitary_matrix(f),
-                wires=[3, 4, 2],
-                control_wires=[0, 1],
+                unitary,
+                wires=input_wires + [4],
+                control_wires=index_wires,
                 control_values=control_values,
             )
 
-        for w in [3, 4, 0, 1]:
+        for w in input_wires:
+            qml.Hadamard(w)
+
+    # global Deutsch Jozsa
+    @qml.qnode(dev)
+    def deutsch_jozsa_new(unitaries):
+        qml.PauliX(wires=4)
+        qml.PauliX(wires=5)
+
+        for w in index_wires + [4, 5]:
             qml.Hadamard(w)
 
+        # x is now |00> for the constant f_i only
+        controlled_oracles(unitaries)
+
         qml.ControlledQubitUnitary(
             qml.PauliX.matrix,
             wires=[5],
-            control_wires=[3, 4],
+            control_wires=input_wires,
             control_values="00",
         )
 
-        return qml.sample(wires=[0, 1])
+        # uncompute x, the phases of f_i square to one
+        controlled_oracles(unitaries)
+
+        for w in index_wires:
+            qml.Hadamard(w)
+
+        return qml.sample(wires=index_wires)
+
+    return deutsch_jozsa_new
+
+
+def deutsch_jozsa_batch(fs_list):
+    """Classifies many quadruples of oracles with one device. Oracle matrices are shared through
+    `oracle_unitary`, and quadruples with the same gate sequences are simulated once.
+
+    Args:
+        - fs_list (list(list(function))): quadruples of quantum functions, as taken by `deutsch_jozsa`
+
+    Returns:
+        - (list(str)) : "4 same" or "2 and 2" for every quadruple
+    """
+
+    circuit = deutsch_jozsa_qnode()
+    verdicts = {}
+    results = []
+
+    for fs in fs_list:
+        keys, unitaries = zip(*(oracle_unitary(f) for f in fs))
+        if keys not in verdicts:
+            # the single shot is deterministic: wires 0 and 1 end in |00> exactly when t_i is constant
+            sample = circuit(list(unitaries))
+            verdicts[keys] = "4 same" if sum(sample) == 0 else "2 and 2"
+        results.append(verdicts[keys])
+
+    return results
+
+
+def deutsch_jozsa(fs):
+    """Function that determines whether four given functions are all of the same type or not.
+
+    Args:
+        - fs (list(function)): A list of 4 quantum functions. Each of them will accept a 'wires' parameter.
+        The first two wires refer to the input and the third to the output of the function.
 
-    sample = deutsch_jozsa_new(fs)
+    Returns:
+        - (str) : "4 same" or "2 and 2"
+    """
 
-    if sum(sample) == 0:
-        return "4 same"
-    else:
-        return "2 and 2"
+    # QHACK #
+    return deutsch_jozsa_batch([fs])[0]
     # QHACK #
 
 
@@ -1,6 +1,9 @@
 #! /usr/bin/python3
 
+import concurrent.futures
+import functools
 import sys
+import time
 import pennylane as qml
 from pennylane import numpy as np
 
@@ -67,6 +70,67 @@ def chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, x, y, alpha, beta):
     return qml.probs(wires=[0, 1])
 
 
+# WINNING_OUTCOMES[2x + y, 2a + b] is 1 if the answers (a, b) win the game for the questions (x, y)
+WINNING_OUTCOMES = np.array(
+    [[1, 0, 0, 1], [1, 0, 0, 1], [1, 0, 0, 1], [0, 1, 1, 0]], requires_grad=False
+)
+
+
+@qml.qnode(dev)
+def entangled_state(alpha, beta):
+    """Returns the state shared by Alice and Bob before they measure
+
+    Args:
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+
+    Returns:
+        - (np.tensor): state vector of the two qubits
+    """
+
+    prepare_entangled(alpha, beta)
+
+    return qml.state()
+
+
+@functools.lru_cache(maxsize=None)
+def shared_state(alpha, beta):
+    """Cached `entangled_state`. It does not depend on the measurement angles, so it is simulated
+    only once per (alpha, beta) during the optimization.
+
+    Args:
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+
+    Returns:
+        - (np.tensor): state as a 2x2 tensor, indexed by the basis states of Alice's and Bob's qubits
+    """
+
+    return np.array(entangled_state(alpha, beta), requires_grad=False).reshape(2, 2)
+
+
+def measurement_probs(params, alpha, beta):
+    """Same probabilities as `chsh_circuit`, evaluated for the four question pairs at once.
+
+    Args:
+        - params (list(float)): List containing [theta_A0,theta_A1,theta_B0,theta_B1]
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+
+    Returns:
+        - (np.tensor): array of shape (4, 4), row 2x + y holds the probabilities of each basis state for the questions (x, y)
+    """
+
+    # RY(theta).inv() for every angle, stacked along the first axis
+    params = np.stack(params)
+    cos, sin = np.cos(params / 2), np.sin(params / 2)
+    rotations = np.stack([np.stack([cos, sin], axis=1), np.stack([-sin, cos], axis=1)], axis=1)
+
+    amplitudes = np.einsum("xac,ybd,cd->xyab", rotations[:2], rotations[2:], shared_state(alpha, beta))
+
+    return np.reshape(np.abs(amplitudes) ** 2, (4, 4))
+
+
 def winning_prob(params, alpha, beta):
     """Define a function that returns the probability of Alice and Bob winning the game.
 
@@ -80,23 +144,10 @@ def winning_prob(params, alpha, beta):
     """
 
     # QHACK #
-    p = 0
-
-    def probs(x, y):
-        return chsh_circuit(
-            params[0], params[1], params[2], params[3], x, y, alpha, beta
-        )
 
-    # P(succes) = P(X=0)P(Y=0|X=0) * (P(A=0,B=0|X=0,Y=0) + P(A=1,B=1|X=0,Y=0))
-    #           + P(X=0)P(Y=1|X=0) * (P(A=0,B=0|X=1,Y=1) + P(A=1,B=1|X=1,Y=1))
-    #           + P(X=1)P(Y=0|X=1) * (P(A=0,B=0|X=1,Y=0) + P(A=1,B=1|X=1,Y=0))
-    #           + P(X=1)P(Y=1|X=1) * (P(A=1,B=0|X=1,Y=1) + P(A=0,B=1|X=1,Y=1))
-
-    p = 0
-    p += 0.5 ** 2 * (probs(0, 0)[0] + probs(0, 0)[3])
-    p += 0.5 ** 2 * (probs(0, 1)[0] + probs(0, 1)[3])
-    p += 0.5 ** 2 * (probs(1, 0)[0] + probs(1, 0)[3])
-    p += 0.5 ** 2 * (probs(1, 1)[1] + probs(1, 1)[2])
+    # P(succes) = sum over (x, y) of P(X=x)P(Y=y) * sum over the (a, b) with a XOR b = x AND y of P(A=a,B=b|X=x,Y=y)
+    # All four (x, y) settings come from a single stacked probability tensor.
+    p = 0.5 ** 2 * np.sum(measurement_probs(params, alpha, beta) * WINNING_OUTCOMES)
 
     return p
     # QHACK #
@@ -138,6 +189,84 @@ def optimize(alpha, beta):
     return winning_prob(params, alpha, beta)
 
 
+def optimize_restart(alpha, beta, seed, max_steps=100, tol=1e-8, patience=10):
+    """Runs the optimization of `optimize` from one seeded starting point, stopping as soon as
+    the winning probability has not improved by more than tol for `patience` consecutive steps.
+
+    Args:
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+        - seed (int): seed of the random starting point
+        - max_steps (int): maximum number of optimization steps
+        - tol (float): smallest improvement of the winning probability that counts as progress
+        - patience (int): number of steps without progress before stopping
+
+    Returns:
+        - (dict): seed, best winning probability, its parameters, number of steps taken and wall time (s)
+    """
+
+    start = time.perf_counter()
+
+    def cost(params):
+        return -winning_prob(params, alpha, beta)
+
+    rng = np.random.default_rng(seed)
+    params = np.array(rng.random(4) * 2 * np.pi, requires_grad=True)
+    opt = qml.NesterovMomentumOptimizer(stepsize=1)
+
+    best_prob, best_params = winning_prob(params, alpha, beta), params
+    stale = 0
+    for step in range(1, max_steps + 1):
+        params = opt.step(cost, params)
+        prob = winning_prob(params, alpha, beta)
+        if prob > best_prob + tol:
+            stale = 0
+        else:
+            stale += 1
+        if prob > best_prob:
+            best_prob, best_params = prob, params
+        if stale >= patience:
+            break
+
+    return {
+        "seed": seed,
+        "winning_prob": float(best_prob),
+        "params": np.array(best_params, requires_grad=False).tolist(),
+        "steps": step,
+        "time": time.perf_counter() - start,
+    }
+
+
+def optimize_multistart(alpha, beta, restarts=8, seed=0, max_steps=100, tol=1e-8, patience=10, workers=None):
+    """Runs `optimize_restart` from several random starting points in parallel worker processes
+    and keeps the best result. The seeds of the restarts all derive from `seed`, so that a run is reproducible.
+
+    Args:
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+        - restarts (int): number of starting points
+        - seed (int): seed from which the seed of every restart is derived
+        - max_steps (int): maximum number of optimization steps per restart
+        - tol (float): smallest improvement of the winning probability that counts as progress
+        - patience (int): number of steps without progress before a restart stops
+        - workers (int): number of worker processes, defaults to the number of cores
+
+    Returns:
+        - (float): best probability of winning
+        - (list(dict)): result of every restart (see `optimize_restart`), in seed order
+    """
+
+    seeds = [int(s) for s in np.random.default_rng(seed).integers(2 ** 32, size=restarts)]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(optimize_restart, alpha, beta, s, max_steps, tol, patience) for s in seeds
+        ]
+        results = [future.result() for future in futures]
+
+    return max(r["winning_prob"] for r in results), results
+
+
 if __name__ == "__main__":
     inputs = sys.stdin.read().split(",")
     output = optimize(float(inputs[0]), float(inputs[1]))
@@ -5,6 +5,7 @@ import pennylane as qml
 from pennylane import numpy as np
 
 dev = qml.device("default.qubit", wires=1, shots=1)
+dev_exact = qml.device("default.qubit", wires=1)
 
 
 @qml.qnode(dev)
@@ -67,6 +68,84 @@ def simulate(angle, n):
     # QHACK #
 
 
+@qml.qnode(dev_exact)
+def bomb_tester_probs(angle):
+    """Same circuit as `bomb_tester`, but returning the exact outcome distribution instead of one sample.
+
+    Args:
+        - angle (float): transmissivity of the Beam splitter right before the final detectors
+
+    Returns:
+        - (np.tensor): probabilities of measuring PauliZ = +1 and PauliZ = -1
+    """
+
+    qml.RY(2 * angle, wires=0)
+
+    return qml.probs(wires=0)
+
+
+def _sample_efficiency(probs, n, shots, rng):
+    """Draws all the one-shot measurements of `simulate` at once from a known outcome distribution.
+
+    Args:
+        - probs (np.ndarray): probabilities of the PauliZ outcomes +1 and -1
+        - n (int): number of bomb circuits concatenated
+        - shots (int): number of repetitions of the whole experiment
+        - rng (np.random.Generator): source of randomness
+
+    Returns:
+        - (float): same estimator as `simulate`
+    """
+
+    samples = rng.choice([1, -1], size=(shots, n + 1), p=np.asarray(probs, dtype=float))
+    bombs_no_explosion = np.sum((1 - samples[:, :n]) / 2) + np.sum(samples[:, n])
+
+    return n / bombs_no_explosion
+
+
+def simulate_batched(angle, n, shots=10000, seed=None):
+    """Batched version of `simulate`: the outcome distribution of `bomb_tester` is computed once
+    and the shots * (n + 1) one-shot measurements are drawn in a single NumPy call.
+    The result follows the same distribution as `simulate`.
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+        - shots (int): number of repetitions of the whole experiment
+        - seed (int): seed of the random generator, for reproducible results
+
+    Returns:
+        - (float): number of bombs successfully tested / number of bombs that didn't explode.
+    """
+
+    return _sample_efficiency(bomb_tester_probs(angle), n, shots, np.random.default_rng(seed))
+
+
+def sweep(angles, ns, shots=10000, seed=None):
+    """Evaluates `simulate_batched` on every combination of angle and number of bombs,
+    computing the outcome distribution only once per angle.
+
+    Args:
+        - angles (list(float)): transmissivities of the beam splitters
+        - ns (list(int)): numbers of bomb circuits concatenated
+        - shots (int): number of repetitions of each experiment
+        - seed (int): seed of the random generator, for reproducible results
+
+    Returns:
+        - (np.ndarray): array of shape (len(angles), len(ns)) with the result of each experiment
+    """
+
+    rng = np.random.default_rng(seed)
+    efficiency = np.zeros((len(angles), len(ns)))
+
+    for i, angle in enumerate(angles):
+        probs = bomb_tester_probs(angle)
+        for j, n in enumerate(ns):
+            efficiency[i, j] = _sample_efficiency(probs, n, shots, rng)
+
+    return efficiency
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
@@ -1,6 +1,7 @@
 #! /usr/bin/python3
 
 import sys
+import functools
 import pennylane as qml
 from pennylane import numpy as np
 
@@ -46,32 +47,278 @@ def basis_states(n):
     return arr
 
 
-def is_particle_preserving(circuit, n):
+def hamming_weights(n):
+    """Number of excitations of every computational basis state of n wires, wire 0 being the most
+    significant bit as in `binary_list`.
+
+    Args:
+        - n (int): number of wires
+
+    Returns:
+        - (np.ndarray): array of length 2**n, entry m is the number of 1s in binary_list(m, n)
+    """
+
+    indices = np.arange(2 ** n, requires_grad=False)
+    weights = np.zeros(2 ** n, dtype=int, requires_grad=False)
+    for bit in range(n):
+        weights += (indices >> bit) & 1
+
+    return weights
+
+
+def block_preserves_particles(outputs, columns, weights, tol=0.0):
+    """Checks that a set of output states only have amplitude on basis states with the same number of
+    excitations as their inputs.
+
+    Args:
+        - outputs (np.ndarray): output states stacked along the last axis, shape (2**n, len(columns))
+        - columns (np.ndarray): index of the basis state each output was obtained from
+        - weights (np.ndarray): lookup table of `hamming_weights`
+        - tol (float): amplitudes of modulus up to tol are treated as zero
+
+    Returns:
+        - (bool): False if any amplitude leaves the weight block of its input
+    """
+
+    leaks = weights[:, None] != weights[None, columns]
+
+    return not np.any(np.abs(outputs[leaks]) > tol)
+
+
+def unitary_preserves_particles(unitary, n, block_size=256, tol=0.0):
+    """Particle conservation check on the matrix of a circuit, column block by column block.
+
+    Args:
+        - unitary (np.ndarray): (2**n, 2**n) matrix of the circuit, column m being the output of binary_list(m, n)
+        - n (int): number of wires
+        - block_size (int): number of columns checked at once
+        - tol (float): amplitudes of modulus up to tol are treated as zero
+
+    Returns:
+        - (bool): True if the matrix is block diagonal in the number of excitations
+    """
+
+    weights = hamming_weights(n)
+    for start in range(0, 2 ** n, block_size):
+        columns = np.arange(start, min(start + block_size, 2 ** n))
+        if not block_preserves_particles(unitary[:, columns], columns, weights, tol):
+            return False
+
+    return True
+
+
+def gates_unitary(gate_list, wire_list, param_list, n):
+    """Matrix of a circuit given as the gate, wire and parameter lists built in the main block,
+    computed once instead of simulating every basis state.
+
+    Args:
+        - gate_list (list(str)): names of the PennyLane operations
+        - wire_list (list(list(int))): wires of every operation
+        - param_list (list(list(float))): parameters of the parametrized operations, in order
+        - n (int): number of wires
+
+    Returns:
+        - (np.ndarray): (2**n, 2**n) matrix of the circuit
+    """
+
+    def ops():
+        j = 0
+        for name, wires in zip(gate_list, wire_list):
+            gate = getattr(qml, str(name))
+            if "non_parametric_ops" not in gate.__module__.split("."):
+                gate(*param_list[j], wires=[int(w) for w in wires])
+                j += 1
+            else:
+                gate(wires=[int(w) for w in wires])
+
+    return qml.transforms.get_unitary_matrix(ops, wire_order=range(n))()
+
+
+# Gates that preserve the number of excitations whatever their parameters: they only swap or
+# rotate basis states of equal weight, or are diagonal.
+PRESERVING_GATES = {
+    "Identity",
+    "PauliZ",
+    "S",
+    "T",
+    "RZ",
+    "PhaseShift",
+    "U1",
+    "CZ",
+    "CRZ",
+    "ControlledPhaseShift",
+    "MultiRZ",
+    "IsingZZ",
+    "SWAP",
+    "ISWAP",
+    "SingleExcitation",
+    "SingleExcitationPlus",
+    "SingleExcitationMinus",
+    "DoubleExcitation",
+    "DoubleExcitationPlus",
+    "DoubleExcitationMinus",
+    "OrbitalRotation",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def gate_preserves_particles(name, params=(), num_wires=None, tol=1e-10):
+    """Classifies a single gate, from PRESERVING_GATES or else from its own small matrix, so that
+    gates such as RX(2 pi) that only preserve the number of excitations for some parameters are resolved too.
+
+    Args:
+        - name (str): name of the PennyLane operation
+        - params (tuple(float)): parameters of the operation
+        - num_wires (int): number of wires, for operations acting on any number of them
+        - tol (float): amplitudes of modulus up to tol are treated as zero
+
+    Returns:
+        - (bool): True if the gate preserves the number of excitations
+    """
+
+    if name in PRESERVING_GATES:
+        return True
+
+    gate = getattr(qml, name)
+    if not isinstance(gate.num_wires, int) or gate.num_wires < 1:
+        if num_wires is None:
+            return False
+        wires = range(num_wires)
+    else:
+        wires = range(gate.num_wires)
+
+    matrix = np.array(gate(*params, wires=wires).matrix, requires_grad=False)
+
+    return unitary_preserves_particles(matrix, len(wires), tol=tol)
+
+
+def _split_by_wires(gates):
+    """Groups gates into the connected components of the wires they act on, keeping their order.
+
+    Args:
+        - gates (list(tuple)): (name, wires, params, preserving) of every gate
+
+    Returns:
+        - (list(list(tuple))): gates of every component
+    """
+
+    parent = {}
+
+    def find(w):
+        while parent.setdefault(w, w) != w:
+            parent[w] = parent[parent[w]]
+            w = parent[w]
+        return w
+
+    for _, wires, _, _ in gates:
+        for w in wires[1:]:
+            parent[find(w)] = find(wires[0])
+
+    components = {}
+    for gate in gates:
+        components.setdefault(find(gate[1][0]), []).append(gate)
+
+    return list(components.values())
+
+
+def _strip_preserving_ends(gates):
+    """Removes the preserving gates before the first and after the last non-preserving one:
+    multiplying by a block diagonal unitary does not change whether a product is block diagonal."""
+
+    flags = [preserving for _, _, _, preserving in gates]
+    if all(flags):
+        return []
+
+    first = flags.index(False)
+    last = len(flags) - 1 - flags[::-1].index(False)
+
+    return gates[first : last + 1]
+
+
+def analyze_particle_conservation(gate_list, wire_list, param_list, n, tol=1e-10):
+    """Decides particle conservation from the gate list, without simulating when the gates settle it.
+
+    Each gate is classified with `gate_preserves_particles`. Runs of preserving gates at either end of the
+    circuit are dropped, and what is left is split into groups of gates acting on disjoint wires. The circuit
+    is the tensor product of these groups and preserves particles exactly when each of them does, so only the
+    groups still containing a non-preserving gate are simulated, each on its own wires.
+
+    Args:
+        - gate_list (list(str)): names of the PennyLane operations
+        - wire_list (list(list(int))): wires of every operation
+        - param_list (list(list(float))): parameters of the parametrized operations, in order
+        - n (int): number of wires of the circuit
+        - tol (float): amplitudes of modulus up to tol are treated as zero
+
+    Returns:
+        - (bool): True if the circuit preserves the number of particles
+        - (int): number of wires of the largest group that had to be simulated, 0 if none
+    """
+
+    gates = []
+    j = 0
+    for name, wires in zip(gate_list, wire_list):
+        name = str(name)
+        wires = [int(w) for w in wires]
+        if "non_parametric_ops" not in getattr(qml, name).__module__.split("."):
+            params = tuple(float(p) for p in param_list[j])
+            j += 1
+        else:
+            params = ()
+        gates.append((name, wires, params, gate_preserves_particles(name, params, len(wires), tol)))
+
+    simulated = 0
+    pending = [gates]
+    while pending:
+        block = _strip_preserving_ends(pending.pop())
+        if not block:
+            continue
+        components = _split_by_wires(block)
+        if len(components) > 1:
+            pending.extend(components)
+            continue
+
+        # a single group mixing its wires: simulate it on those wires only
+        block_wires = sorted({w for _, wires, _, _ in block for w in wires})
+        position = {w: i for i, w in enumerate(block_wires)}
+        unitary = gates_unitary(
+            [name for name, _, _, _ in block],
+            [[position[w] for w in wires] for _, wires, _, _ in block],
+            [params for _, _, params, _ in block if params],
+            len(block_wires),
+        )
+        simulated = max(simulated, len(block_wires))
+        if not unitary_preserves_particles(unitary, len(block_wires), tol=tol):
+            return False, simulated
+
+    return True, simulated
+
+
+def is_particle_preserving(circuit, n, tol=0.0):
     """Given a circuit and its number of wires n, returns 1 if it preserves the number of particles, and 0 if it does not
 
+    The circuit is only available as a function of its input state, so it is simulated once per basis input,
+    and every output is checked against the Hamming weight table as soon as it is produced.
+
     Args:
         - circuit (qml.QNode): A QNode that has a state such as [0,0,1,0] as an input and outputs the final state after performing
         quantum operation
         - n (int): the number of wires of circuit
+        - tol (float): amplitudes of modulus up to tol are treated as zero
 
     Returns:
         - (bool): True / False according to whether the input circuit preserves the number of particles or not
     """
 
-    dev = qml.device("default.qubit", wires=n)
-
     # QHACK #
-    for i in range(2 ** n):
-        input = basis_states(n)[i]
-        output = circuit(input)
-
-        input_excitations = np.sum(input)
+    weights = hamming_weights(n)
+    # bits of every basis input, built once rather than through basis_states(n) on every iteration
+    inputs = (np.arange(2 ** n)[:, None] >> np.arange(n - 1, -1, -1)) & 1
 
-        for j, x in enumerate(output):
-            if x != 0:
-                output_excitations = np.sum(basis_states(n)[j])
-                if input_excitations != output_excitations:
-                    return False
+    for m in range(2 ** n):
+        output = circuit(inputs[m])
+        if not block_preserves_particles(output[:, None], [m], weights, tol):
+            return False
     return True
     # QHACK #
 
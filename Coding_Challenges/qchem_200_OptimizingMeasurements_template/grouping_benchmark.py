@@ -0,0 +1,33 @@
+#! /usr/bin/python3
+
+"""Compression ratio and wall time of the grouping strategies of `optimize_measurements`
+on random Hamiltonians of growing size.
+
+Usage:
+    python grouping_benchmark.py [--identity-prob P] [--seed S]
+"""
+
+import argparse
+
+from optimizing_measurements_jcpbus import STRATEGIES, benchmark_strategies
+
+SIZES = [(50, 6), (200, 8), (500, 12), (1000, 16), (2000, 20)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--identity-prob", type=float, default=0.6, help="probability of an identity letter")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random Hamiltonians")
+    parser.add_argument("--strategies", nargs="*", default=list(STRATEGIES), choices=list(STRATEGIES))
+    args = parser.parse_args(argv)
+
+    print(f"{'terms':>6} {'qubits':>6}  {'strategy':<14}{'groups':>7} {'ratio':>7} {'time':>9}")
+    for row in benchmark_strategies(SIZES, args.strategies, args.identity_prob, args.seed):
+        print(
+            f"{row['terms']:>6} {row['qubits']:>6}  {row['strategy']:<14}{row['groups']:>7} "
+            f"{row['compression_ratio']:>7.3f} {row['wall_time']:>8.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
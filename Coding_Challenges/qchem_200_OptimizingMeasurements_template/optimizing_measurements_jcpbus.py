@@ -1,6 +1,8 @@
 #! /usr/bin/python3
 
 import sys
+import time
+import numpy as np
 
 
 def check_simplification(op1, op2):
@@ -50,31 +52,532 @@ def join_operators(op1, op2):
     # QHACK
 
 
-def optimize_measurements(obs_hamiltonian):
+def optimize_measurements(obs_hamiltonian, strategy="first_fit"):
     """This function will go through the list of Pauli words provided in the statement, grouping the operators
     following the simplification process of the previous functions.
 
     Args:
         - obs_hamiltonian (list(list(str))): Groups of Pauli words making up the Hamiltonian.
+        - strategy (str): One of STRATEGIES. "first_fit" follows the order of the input, the others
+        color the graph of words that cannot be simplified together.
 
     Returns:
         - (list(list(str))): The chosen Pauli operators to measure after grouping.
     """
 
-    final_solution = []
+    if len(obs_hamiltonian) == 0:
+        return []
 
-    for op1 in obs_hamiltonian:
-        added = False
-        for i, op2 in enumerate(final_solution):
+    # Same first-fit grouping as comparing the words with `check_simplification` and merging them
+    # with `join_operators`, run on bitmasks.
+    x, z = pack_pauli_words(obs_hamiltonian)
+    group_x, group_z, _ = group_packed(x, z, strategy)
 
-            if check_simplification(op1, op2):
-                final_solution[i] = join_operators(op1, op2)
-                added = True
-                break
-        if not added:
-            final_solution.append(op1)
+    return unpack_pauli_words(group_x, group_z, len(obs_hamiltonian[0]))
 
-    return final_solution
+
+def pack_pauli_words(obs_hamiltonian):
+    """Encodes Pauli words as X and Z bitmasks: X is (1, 0), Z is (0, 1), Y is (1, 1) and I is (0, 0).
+
+    Args:
+        - obs_hamiltonian (list(list(str))): Groups of Pauli words making up the Hamiltonian.
+
+    Returns:
+        - (np.ndarray): X bits, array of shape (len(obs_hamiltonian), ceil(n_qubits / 64)) of np.uint64,
+        qubit q is bit q % 64 of word q // 64.
+        - (np.ndarray): Z bits, same layout.
+    """
+
+    letters = np.array(obs_hamiltonian, dtype="U1").reshape(len(obs_hamiltonian), -1)
+
+    return pack_bits((letters == "X") | (letters == "Y")), pack_bits((letters == "Z") | (letters == "Y"))
+
+
+def pack_bits(bits):
+    """Packs the rows of a boolean array into 64-bit words, little-endian.
+
+    Args:
+        - bits (np.ndarray): boolean array of shape (m, n_qubits)
+
+    Returns:
+        - (np.ndarray): array of shape (m, ceil(n_qubits / 64)) of np.uint64
+    """
+
+    m, n_qubits = bits.shape
+    padded = np.zeros((m, -(-n_qubits // 64) * 64), dtype=bool)
+    padded[:, :n_qubits] = bits
+
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8")
+
+
+def unpack_pauli_words(x, z, n_qubits):
+    """Inverse of `pack_pauli_words`.
+
+    Args:
+        - x (np.ndarray): X bits, as returned by `pack_pauli_words`
+        - z (np.ndarray): Z bits, as returned by `pack_pauli_words`
+        - n_qubits (int): Number of qubits of the words
+
+    Returns:
+        - (list(list(str))): Pauli words
+    """
+
+    def unpack(words):
+        return np.unpackbits(words.view(np.uint8), axis=1, bitorder="little")[:, :n_qubits]
+
+    letters = np.array(["I", "X", "Z", "Y"])[unpack(x) + 2 * unpack(z)]
+
+    return letters.tolist()
+
+
+def compatible(x1, z1, x2, z2):
+    """Vectorised `check_simplification`: two words can be measured together if on every qubit they
+    act with the same Pauli operator or one of them acts trivially. Arguments broadcast against each other.
+
+    Args:
+        - x1, z1 (np.ndarray): bitmasks of the first words, last axis indexing 64-qubit words
+        - x2, z2 (np.ndarray): bitmasks of the second words, same layout
+
+    Returns:
+        - (np.ndarray): 'True' where the words can be simplified, with the last axis reduced.
+    """
+
+    conflict = (x1 | z1) & (x2 | z2) & ((x1 ^ x2) | (z1 ^ z2))
+
+    return ~np.any(conflict, axis=-1)
+
+
+def compatibility_matrix(x, z, block_size=1024):
+    """Pairwise `check_simplification` of all the words, computed in blocks of rows to bound memory.
+
+    Args:
+        - x (np.ndarray): X bits, as returned by `pack_pauli_words`
+        - z (np.ndarray): Z bits, as returned by `pack_pauli_words`
+        - block_size (int): number of rows computed at once
+
+    Returns:
+        - (np.ndarray): symmetric boolean matrix, entry (i, j) is 'True' if words i and j can be simplified
+    """
+
+    m = len(x)
+    matrix = np.empty((m, m), dtype=bool)
+    for start in range(0, m, block_size):
+        rows = slice(start, start + block_size)
+        matrix[rows] = compatible(x[rows, None], z[rows, None], x[None], z[None])
+
+    return matrix
+
+
+def group_packed(x, z, strategy="first_fit"):
+    """Groups packed words with one of STRATEGIES.
+
+    Args:
+        - x (np.ndarray): X bits, as returned by `pack_pauli_words`
+        - z (np.ndarray): Z bits, as returned by `pack_pauli_words`
+        - strategy (str): grouping strategy
+
+    Returns:
+        - (np.ndarray): X bits of the merged word of every group
+        - (np.ndarray): Z bits of the merged word of every group
+        - (np.ndarray): index of the group of every word
+    """
+
+    if strategy == "first_fit":
+        return group_first_fit(x, z)
+
+    conflicts = ~compatibility_matrix(x, z)
+    np.fill_diagonal(conflicts, False)
+    labels = STRATEGIES[strategy](conflicts)
+
+    n_groups = labels.max() + 1
+    group_x = np.zeros((n_groups, x.shape[1]), dtype=x.dtype)
+    group_z = np.zeros((n_groups, z.shape[1]), dtype=z.dtype)
+    np.bitwise_or.at(group_x, labels, x)
+    np.bitwise_or.at(group_z, labels, z)
+
+    return group_x, group_z, labels
+
+
+def greedy_coloring(conflicts, order):
+    """Gives each vertex, in the given order, the smallest color not used by its neighbours.
+
+    Args:
+        - conflicts (np.ndarray): boolean adjacency matrix of the graph
+        - order (np.ndarray): order in which the vertices are colored
+
+    Returns:
+        - (np.ndarray): color of every vertex
+    """
+
+    colors = np.full(len(conflicts), -1)
+    for v in order:
+        used = np.zeros(len(conflicts) + 1, dtype=bool)
+        used[colors[conflicts[v]]] = True
+        used[-1] = False  # uncolored neighbours index the extra slot
+        colors[v] = np.argmin(used)
+
+    return colors
+
+
+def largest_first_coloring(conflicts):
+    """Greedy coloring of the vertices by decreasing degree (Welsh-Powell).
+
+    Args:
+        - conflicts (np.ndarray): boolean adjacency matrix of the graph
+
+    Returns:
+        - (np.ndarray): color of every vertex
+    """
+
+    degrees = conflicts.sum(axis=1)
+
+    return greedy_coloring(conflicts, np.argsort(-degrees, kind="stable"))
+
+
+def dsatur_coloring(conflicts):
+    """DSATUR: always colors next the vertex whose neighbours already use the most distinct colors,
+    breaking ties by degree.
+
+    Args:
+        - conflicts (np.ndarray): boolean adjacency matrix of the graph
+
+    Returns:
+        - (np.ndarray): color of every vertex
+    """
+
+    m = len(conflicts)
+    degrees = conflicts.sum(axis=1)
+    colors = np.full(m, -1)
+    # neighbour_colors[v, c] is True if a neighbour of v has color c
+    neighbour_colors = np.zeros((m, m), dtype=bool)
+    saturation = np.zeros(m, dtype=np.int64)
+
+    for _ in range(m):
+        priority = np.where(colors < 0, saturation * (m + 1) + degrees, -1)
+        v = np.argmax(priority)
+        color = np.argmin(neighbour_colors[v])
+        colors[v] = color
+
+        newly = conflicts[v] & ~neighbour_colors[:, color]
+        saturation[newly] += 1
+        neighbour_colors[newly, color] = True
+
+    return colors
+
+
+def rlf_coloring(conflicts):
+    """Recursive largest first: builds one color class at a time, starting from the uncolored vertex
+    with most uncolored neighbours and repeatedly adding the candidate that shares the most neighbours
+    with the vertices already excluded from the class.
+
+    Args:
+        - conflicts (np.ndarray): boolean adjacency matrix of the graph
+
+    Returns:
+        - (np.ndarray): color of every vertex
+    """
+
+    m = len(conflicts)
+    colors = np.full(m, -1)
+    # float32 so that the products go through BLAS, counts stay exact below 2**24
+    conflicts_float = conflicts.astype(np.float32)
+    color = 0
+
+    while (colors < 0).any():
+        uncolored = colors < 0
+        degrees = conflicts_float @ uncolored
+        v = np.argmax(np.where(uncolored, degrees, -1))
+
+        colors[v] = color
+        # candidates can still join the class, excluded ones are neighbours of a member
+        excluded = uncolored & conflicts[v]
+        candidates = uncolored & ~excluded
+        candidates[v] = False
+        in_excluded = conflicts_float @ excluded
+
+        while candidates.any():
+            u = np.argmax(np.where(candidates, in_excluded * (m + 1) + (m - degrees), -1))
+            colors[u] = color
+            candidates[u] = False
+            newly = candidates & conflicts[u]
+            candidates &= ~newly
+            excluded |= newly
+            in_excluded += conflicts_float[:, newly].sum(axis=1)
+
+        color += 1
+
+    return colors
+
+
+def group_first_fit(x, z):
+    """First-fit grouping of `optimize_measurements` on packed words: each word joins the first group
+    it can be simplified with, or starts a new one. A word is compatible with a group exactly when it
+    is compatible with the union of its words, so each group is kept as a single merged bitmask.
+
+    Args:
+        - x (np.ndarray): X bits, as returned by `pack_pauli_words`
+        - z (np.ndarray): Z bits, as returned by `pack_pauli_words`
+
+    Returns:
+        - (np.ndarray): X bits of the merged word of every group
+        - (np.ndarray): Z bits of the merged word of every group
+        - (np.ndarray): index of the group of every word
+    """
+
+    group_x, group_z, n_groups, labels = extend_groups(np.zeros_like(x), np.zeros_like(z), 0, x, z)
+
+    return group_x[:n_groups], group_z[:n_groups], labels
+
+
+def extend_groups(group_x, group_z, n_groups, x, z):
+    """Adds words to existing first-fit groups, so that a Hamiltonian can be grouped chunk by chunk.
+    The group arrays are updated in place and doubled when they are full.
+
+    Args:
+        - group_x (np.ndarray): X bits of the groups, only the first n_groups rows are used
+        - group_z (np.ndarray): Z bits of the groups, same layout
+        - n_groups (int): number of groups so far
+        - x (np.ndarray): X bits of the new words, as returned by `pack_pauli_words`
+        - z (np.ndarray): Z bits of the new words
+
+    Returns:
+        - (np.ndarray): X bits of the groups, possibly reallocated
+        - (np.ndarray): Z bits of the groups, possibly reallocated
+        - (int): number of groups
+        - (np.ndarray): index of the group of every new word
+    """
+
+    # A repeated word always joins the group of its first occurrence: groups that rejected it then
+    # have only grown since. Only distinct words are placed, in order of first occurrence.
+    words = np.concatenate([x, z], axis=1)
+    _, first, inverse = np.unique(words, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    distinct = first[order]
+    labels = np.empty(len(distinct), dtype=np.int64)
+
+    for j, i in enumerate(distinct):
+        fits = compatible(group_x[:n_groups], group_z[:n_groups], x[i], z[i])
+        group = int(np.argmax(fits)) if fits.any() else n_groups
+        if group == n_groups:
+            if n_groups == len(group_x):
+                extra = np.zeros((max(n_groups, 1), group_x.shape[1]), dtype=group_x.dtype)
+                group_x = np.concatenate([group_x, extra])
+                group_z = np.concatenate([group_z, extra])
+            n_groups += 1
+        group_x[group] |= x[i]
+        group_z[group] |= z[i]
+        labels[j] = group
+
+    # labels[rank of the first occurrence] for every word
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    return group_x, group_z, n_groups, labels[rank[np.reshape(inverse, -1)]]
+
+
+def group_stream(chunks, n_qubits):
+    """First-fit grouping of a Hamiltonian read in chunks. Gives the same groups as `group_first_fit`
+    on the whole Hamiltonian while keeping only the groups in memory.
+
+    Args:
+        - chunks (iterable((np.ndarray, np.ndarray))): X and Z bits of consecutive blocks of words
+        - n_qubits (int): number of qubits of the words
+
+    Returns:
+        - (np.ndarray): X bits of the merged word of every group
+        - (np.ndarray): Z bits of the merged word of every group
+        - (int): number of words read
+    """
+
+    n_words = -(-n_qubits // 64)
+    group_x = np.zeros((64, n_words), dtype="<u8")
+    group_z = np.zeros((64, n_words), dtype="<u8")
+    n_groups = 0
+    n_terms = 0
+
+    for x, z in chunks:
+        group_x, group_z, n_groups, _ = extend_groups(group_x, group_z, n_groups, x, z)
+        n_terms += len(x)
+
+    return group_x[:n_groups], group_z[:n_groups], n_terms
+
+
+# Binary Hamiltonian files: this magic, the number of qubits as a little-endian uint64, then every word
+# as its X bits followed by its Z bits, each ceil(n_qubits / 64) little-endian uint64.
+BINARY_MAGIC = b"QHPAULI\x01"
+
+# byte value -> (X bit, Z bit), for the letters of the text format
+_X_BIT = np.zeros(256, dtype=bool)
+_Z_BIT = np.zeros(256, dtype=bool)
+_X_BIT[[ord("X"), ord("Y")]] = True
+_Z_BIT[[ord("Z"), ord("Y")]] = True
+_LETTER = np.zeros(256, dtype=bool)
+_LETTER[[ord(c) for c in "IXYZ"]] = True
+
+
+def read_hamiltonian_chunks(stream, chunk_terms=1 << 16, block_size=1 << 20):
+    """Reads a Hamiltonian from a binary stream in either format, detected from its first bytes:
+    the comma-separated text of the challenge inputs, or the binary format of `write_binary_hamiltonian`.
+
+    Args:
+        - stream (io.BufferedIOBase): stream opened in binary mode, e.g. sys.stdin.buffer
+        - chunk_terms (int): maximum number of words per chunk
+        - block_size (int): bytes read at once from text input
+
+    Returns:
+        - (int): number of qubits of the words
+        - (generator): (X bits, Z bits) of consecutive chunks of words. The chunks are views of one
+        preallocated buffer, valid until the next one is requested.
+    """
+
+    prefix = stream.read(len(BINARY_MAGIC))
+    if prefix == BINARY_MAGIC:
+        n_qubits = int(np.frombuffer(stream.read(8), dtype="<u8")[0])
+        return n_qubits, _binary_chunks(stream, n_qubits, chunk_terms)
+
+    header = bytearray(prefix)
+    while b"," not in header:
+        block = stream.read(64)
+        if not block:
+            break
+        header += block
+    n_qubits, _, rest = bytes(header).partition(b",")
+    n_qubits = int(n_qubits)
+
+    return n_qubits, _text_chunks(stream, rest, n_qubits, chunk_terms, block_size)
+
+
+def _binary_chunks(stream, n_qubits, chunk_terms):
+    """Reads the records of the binary format straight into a preallocated buffer of chunk_terms words.
+
+    A read may stop in the middle of a record, e.g. on a pipe. The buffer is then filled further until it
+    holds whole records only, so that no record is ever split across two chunks.
+
+    Args:
+        - stream (io.BufferedIOBase): stream positioned after the header of `write_binary_hamiltonian`
+        - n_qubits (int): number of qubits of the words
+        - chunk_terms (int): maximum number of words per chunk
+
+    Returns:
+        - (generator): (X bits, Z bits) of consecutive chunks of words, views of the buffer that are
+        overwritten by the next chunk
+    """
+
+    n_words = -(-n_qubits // 64)
+    buffer = np.empty((chunk_terms, 2, n_words), dtype="<u8")
+    view = memoryview(buffer).cast("B")
+    record = 2 * n_words * 8
+
+    while True:
+        n_bytes = stream.readinto(view)
+        while n_bytes and n_bytes % record:
+            more = stream.readinto(view[n_bytes:])
+            if not more:
+                raise ValueError("Truncated binary Hamiltonian")
+            n_bytes += more
+        if not n_bytes:
+            return
+        k = n_bytes // record
+        yield buffer[:k, 0], buffer[:k, 1]
+
+
+def _text_chunks(stream, rest, n_qubits, chunk_terms, block_size):
+    """Parses the comma-separated text of the challenge inputs block by block.
+
+    Every byte that is not a Pauli letter (commas, whitespace) is dropped, and the letters are cut into
+    words of n_qubits letters. A block of bytes rarely ends on a word boundary, so the letters of the last,
+    incomplete word are kept as `pending` and prepended to the letters of the next block.
+
+    Args:
+        - stream (io.BufferedIOBase): stream positioned after the bytes in rest
+        - rest (bytes): what was read past the number of qubits while detecting the format
+        - n_qubits (int): number of qubits of the words
+        - chunk_terms (int): maximum number of words per chunk
+        - block_size (int): bytes read at once
+
+    Returns:
+        - (generator): (X bits, Z bits) of consecutive chunks of words, views of a preallocated buffer
+        that are overwritten by the next chunk. Raises ValueError at the end of the input if letters
+        of an incomplete word are left.
+    """
+
+    n_words = -(-n_qubits // 64)
+    buffer = np.empty((chunk_terms, 2, n_words), dtype="<u8")
+    # letters of a word not yet complete at the end of a block
+    pending = np.empty(0, dtype=np.uint8)
+    block = rest
+
+    while True:
+        letters = np.frombuffer(block, dtype=np.uint8)
+        letters = np.concatenate([pending, letters[_LETTER[letters]]])
+        n_complete = len(letters) // n_qubits * n_qubits
+        pending = letters[n_complete:]
+        words = letters[:n_complete].reshape(-1, n_qubits)
+
+        for start in range(0, len(words), chunk_terms):
+            chunk = words[start : start + chunk_terms]
+            k = len(chunk)
+            buffer[:k, 0] = pack_bits(_X_BIT[chunk])
+            buffer[:k, 1] = pack_bits(_Z_BIT[chunk])
+            yield buffer[:k, 0], buffer[:k, 1]
+
+        block = stream.read(block_size)
+        if not block:
+            break
+
+    if len(pending):
+        raise ValueError("Truncated Pauli word at the end of the input")
+
+
+def write_binary_hamiltonian(stream, n_qubits, chunks):
+    """Writes packed words in the binary format read by `read_hamiltonian_chunks`.
+
+    Args:
+        - stream (io.BufferedIOBase): stream opened in binary mode
+        - n_qubits (int): number of qubits of the words
+        - chunks (iterable((np.ndarray, np.ndarray))): X and Z bits of consecutive blocks of words
+
+    Returns:
+        - (int): number of words written
+    """
+
+    stream.write(BINARY_MAGIC)
+    stream.write(np.array([n_qubits], dtype="<u8").tobytes())
+
+    n_terms = 0
+    for x, z in chunks:
+        stream.write(np.ascontiguousarray(np.stack([x, z], axis=1), dtype="<u8").tobytes())
+        n_terms += len(x)
+
+    return n_terms
+
+
+def stream_compression_ratio(stream, chunk_terms=1 << 16):
+    """Streaming counterpart of the `__main__` block: groups the Hamiltonian while it is read, so that
+    memory grows with the number of groups rather than with the size of the input.
+
+    Args:
+        - stream (io.BufferedIOBase): input in either format of `read_hamiltonian_chunks`
+        - chunk_terms (int): maximum number of words per chunk
+
+    Returns:
+        - (float): compression ratio of the first-fit grouping
+        - (list(list(str))): the chosen Pauli operators to measure
+    """
+
+    n_qubits, chunks = read_hamiltonian_chunks(stream, chunk_terms)
+    group_x, group_z, n_terms = group_stream(chunks, n_qubits)
+    final_solution = unpack_pauli_words(group_x, group_z, n_qubits)
+
+    return 1 - len(final_solution) / n_terms, final_solution
+
+
+STRATEGIES = {
+    "first_fit": None,
+    "largest_first": largest_first_coloring,
+    "dsatur": dsatur_coloring,
+    "rlf": rlf_coloring,
+}
 
 
 def compression_ratio(obs_hamiltonian, final_solution):
@@ -94,6 +597,61 @@ def compression_ratio(obs_hamiltonian, final_solution):
     # QHACK
 
 
+def random_hamiltonian(n_terms, n_qubits, identity_prob=0.5, seed=None):
+    """Draws random Pauli words, each letter being the identity with probability identity_prob
+    and X, Y or Z otherwise.
+
+    Args:
+        - n_terms (int): number of Pauli words
+        - n_qubits (int): length of the words
+        - identity_prob (float): probability of an identity letter
+        - seed (int): seed of the random generator
+
+    Returns:
+        - (list(list(str))): the Pauli words
+    """
+
+    rng = np.random.default_rng(seed)
+    p = (1 - identity_prob) / 3
+    letters = rng.choice(list("IXYZ"), size=(n_terms, n_qubits), p=[identity_prob, p, p, p])
+
+    return letters.tolist()
+
+
+def benchmark_strategies(sizes, strategies=None, identity_prob=0.5, seed=0):
+    """Compares the grouping strategies on random Hamiltonians.
+
+    Args:
+        - sizes (list((int, int))): (number of terms, number of qubits) of every Hamiltonian
+        - strategies (list(str)): strategies to run, all of STRATEGIES by default
+        - identity_prob (float): probability of an identity letter
+        - seed (int): seed of the random Hamiltonians
+
+    Returns:
+        - (list(dict)): terms, qubits, strategy, groups, compression ratio and wall time (s) of every run
+    """
+
+    rows = []
+    for n_terms, n_qubits in sizes:
+        obs_hamiltonian = random_hamiltonian(n_terms, n_qubits, identity_prob, seed)
+        for strategy in strategies or STRATEGIES:
+            start = time.perf_counter()
+            final_solution = optimize_measurements(obs_hamiltonian, strategy)
+            wall_time = time.perf_counter() - start
+            rows.append(
+                {
+                    "terms": n_terms,
+                    "qubits": n_qubits,
+                    "strategy": strategy,
+                    "groups": len(final_solution),
+                    "compression_ratio": compression_ratio(obs_hamiltonian, final_solution),
+                    "wall_time": wall_time,
+                }
+            )
+
+    return rows
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
 
@@ -0,0 +1,38 @@
+#! /usr/bin/python3
+
+"""Groups a Hamiltonian while streaming it, or converts it to the binary format.
+
+The input is either the comma-separated text of the challenge fixtures or a binary file written
+by `write_binary_hamiltonian`, read from FILE or stdin.
+
+Usage:
+    python stream_grouping.py [FILE] [--to-binary OUT] [--chunk-terms N]
+"""
+
+import argparse
+import sys
+
+from optimizing_measurements_jcpbus import read_hamiltonian_chunks, stream_compression_ratio, write_binary_hamiltonian
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", default=None, help="Hamiltonian file (default: stdin)")
+    parser.add_argument("--to-binary", default=None, help="convert the input to a binary file instead of grouping it")
+    parser.add_argument("--chunk-terms", type=int, default=1 << 16, help="words parsed at once")
+    args = parser.parse_args(argv)
+
+    stream = open(args.input, "rb") if args.input else sys.stdin.buffer
+    with stream:
+        if args.to_binary:
+            n_qubits, chunks = read_hamiltonian_chunks(stream, args.chunk_terms)
+            with open(args.to_binary, "wb") as out:
+                n_terms = write_binary_hamiltonian(out, n_qubits, chunks)
+            print(f"{n_terms} words of {n_qubits} qubits written to {args.to_binary}")
+        else:
+            ratio, _ = stream_compression_ratio(stream, args.chunk_terms)
+            print(ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,15 +16,78 @@ def givens_rotations(a, b, c, d):
     """
 
     # QHACK #
-    theta1 = 2 * np.arctan(np.sqrt((b ** 2 + c ** 2) / (a ** 2 + d ** 2)))
-    theta2 = 2 * np.arctan(c / b)
-    theta3 = 2 * np.arctan(d / a)
+    return givens_rotations_batch(np.array([[a, b, c, d]]))[0].tolist()
+    # QHACK #
 
-    def f(x):
-        return x  # ((x + np.pi) % (2 * np.pi)) - np.pi
 
-    return [f(theta1), f(theta2), f(theta3)]
-    # QHACK #
+def givens_rotations_batch(amplitudes):
+    """Vectorised `givens_rotations` for many states at once, using atan2 so that zero amplitudes
+    need no special casing.
+
+    The circuit of the problem prepares
+        a = cos(theta1 / 2) cos(theta3 / 2),     b = -sin(theta1 / 2) cos(theta2 / 2),
+        c = sin(theta1 / 2) sin(theta2 / 2),     d = -cos(theta1 / 2) sin(theta3 / 2).
+    cos(theta1 / 2) >= 0 in [-pi, pi), so its sign is fixed, and sin(theta1 / 2) takes the sign
+    that keeps cos(theta2 / 2) >= 0, i.e. the opposite of b (of c when b = 0). As in the scalar
+    version, |sin(theta1 / 2)| is taken from b and c, so rows that are only approximately normalized
+    reproduce b and c exactly.
+
+    Args:
+        - amplitudes (np.ndarray): array of shape (N, 4) with the normalized amplitudes a, b, c and d
+        of every state, a > 0
+
+    Returns:
+        - (np.ndarray): array of shape (N, 3) with theta1, theta2 and theta3 of every state
+    """
+
+    a, b, c, d = np.asarray(amplitudes, dtype=float).T
+
+    sign = np.where(b != 0, np.sign(b), np.where(c != 0, np.sign(c), 1.0))
+    sin1 = np.minimum(np.hypot(b, c), 1.0)
+    theta1 = 2 * np.arctan2(-sign * sin1, np.sqrt(1 - sin1 ** 2))
+    theta2 = 2 * np.arctan2(-sign * c, sign * b)
+    theta3 = 2 * np.arctan2(-d, a)
+
+    return np.stack([theta1, theta2, theta3], axis=1)
+
+
+def givens_amplitudes(angles):
+    """Amplitudes a, b, c and d prepared by the circuit of the problem, the inverse of `givens_rotations_batch`.
+
+    Args:
+        - angles (np.ndarray): array of shape (N, 3) with theta1, theta2 and theta3 of every state
+
+    Returns:
+        - (np.ndarray): array of shape (N, 4) with the normalized amplitudes a, b, c and d
+    """
+
+    cos = np.cos(np.asarray(angles, dtype=float) / 2)
+    sin = np.sin(np.asarray(angles, dtype=float) / 2)
+
+    return np.stack(
+        [
+            cos[:, 0] * cos[:, 2],
+            -sin[:, 0] * cos[:, 1],
+            sin[:, 0] * sin[:, 1],
+            -cos[:, 0] * sin[:, 2],
+        ],
+        axis=1,
+    )
+
+
+def check_givens_rotations(amplitudes, angles, atol=1e-9):
+    """Round-trip check: rebuilds the amplitudes from the angles and compares them with the input amplitudes.
+
+    Args:
+        - amplitudes (np.ndarray): array of shape (N, 4) given to `givens_rotations_batch`
+        - angles (np.ndarray): array of shape (N, 3) it returned
+        - atol (float): absolute tolerance on each amplitude
+
+    Returns:
+        - (np.ndarray): boolean array of length N, False for the states that are not reproduced
+    """
+
+    return np.all(np.abs(givens_amplitudes(angles) - np.asarray(amplitudes, dtype=float)) <= atol, axis=1)
 
 
 if __name__ == "__main__":
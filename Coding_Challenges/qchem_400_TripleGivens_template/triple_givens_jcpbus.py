@@ -1,10 +1,33 @@
 import sys
 import pennylane as qml
 from pennylane import numpy as np
+from pennylane.devices.default_qubit import DefaultQubit
+from pennylane.operation import AnyWires, Operation
+from pennylane.ops.qubit.qchem_ops import four_term_grad_recipe
 
 NUM_WIRES = 6
 
 
+def excitation_indices(n_wires):
+    """Basis states mixed by an excitation of n_wires / 2 particles on n_wires wires.
+
+    Args:
+        - n_wires (int): number of wires of the excitation, even
+
+    Returns:
+        - (int): index of |0...01...1>, the state whose particles are excited
+        - (int): index of |1...10...0>, the state they are excited to
+    """
+
+    assert n_wires % 2 == 0, "Number of wires must be even"
+
+    half = n_wires // 2
+    x = 2 ** half - 1
+    y = x << half
+
+    return x, y
+
+
 def triple_excitation_matrix(gamma, n_wires=6):
     """The matrix representation of a triple-excitation Givens rotation.
 
@@ -15,43 +38,109 @@ def triple_excitation_matrix(gamma, n_wires=6):
         - (np.ndarray): The matrix representation of a triple-excitation
     """
 
-    assert n_wires % 2 == 0, "Number of wires must be even"
+    x, y = excitation_indices(n_wires)
+
+    # constant masks rather than item assignment, so that the matrix stays differentiable in gamma
+    rest = np.identity(2 ** n_wires, requires_grad=False)
+    rest[[x, y], [x, y]] = 0
+    diagonal = np.zeros((2 ** n_wires, 2 ** n_wires), requires_grad=False)
+    diagonal[[x, y], [x, y]] = 1
+    off_diagonal = np.zeros((2 ** n_wires, 2 ** n_wires), requires_grad=False)
+    off_diagonal[y, x] = 1
+    off_diagonal[x, y] = -1
+
+    return rest + np.cos(gamma / 2) * diagonal + np.sin(gamma / 2) * off_diagonal
+
+
+class MultiExcitation(Operation):
+    """Givens rotation between |0...01...1> and |1...10...0> on an even number of wires, the
+    triple excitation being the 6-wire case. All other basis states are left unchanged.
+
+    On `SparseExcitationQubit` it is applied to the two affected amplitudes only, other devices
+    decompose it into a qml.QubitUnitary of the dense `triple_excitation_matrix`. Like qml.SingleExcitation and qml.DoubleExcitation,
+    it satisfies a four-term parameter-shift rule.
+    """
+
+    num_wires = AnyWires
+    num_params = 1
+    grad_method = "A"
+    grad_recipe = four_term_grad_recipe
 
-    def single_unit_matrix(i, j):
-        """
-        Returns matrix with zeros except at index [i,j] where it is 1.
-        """
-        m = np.zeros((2 ** n_wires, 2 ** n_wires))
-        m[i, j] = 1
-        return m
+    @property
+    def matrix(self):
+        (gamma,) = self.parameters
+        if self.inverse:
+            gamma = -gamma
+        return triple_excitation_matrix(gamma, len(self.wires))
 
-    # binary
-    x = [0] * int(n_wires / 2) + [1] * int(n_wires / 2)
-    y = x[::-1]
+    @staticmethod
+    def decomposition(gamma, wires):
+        return [qml.QubitUnitary(triple_excitation_matrix(gamma, len(wires)), wires=wires)]
 
-    # convert x to base 10 number
-    x_dec = int("".join(map(str, x)), 2)
-    y_dec = int("".join(map(str, y)), 2)
+    def adjoint(self):
+        (gamma,) = self.parameters
+        return MultiExcitation(-gamma, wires=self.wires)
 
-    m = (
-        np.identity(2 ** n_wires)
-        - single_unit_matrix(x_dec, x_dec)
-        - single_unit_matrix(y_dec, y_dec)
-    )
 
-    m += np.cos(gamma / 2) * single_unit_matrix(2 ** n_wires - x_dec, x_dec)
-    m += np.sin(gamma / 2) * single_unit_matrix(y_dec, x_dec)
+def apply_multi_excitation(state, gamma, axes):
+    """Applies `MultiExcitation` in place to a state tensor, touching only the two slices of amplitudes
+    where the excitation wires read |0...01...1> or |1...10...0>.
 
-    m += np.cos(gamma / 2) * single_unit_matrix(y_dec, y_dec)
-    m += -np.sin(gamma / 2) * single_unit_matrix(x_dec, y_dec)
+    Args:
+        - state (np.ndarray): state of shape [2] * num_wires
+        - gamma (float): angle of rotation
+        - axes (list(int)): axes of the excitation wires, in order
 
-    return m
+    Returns:
+        - (np.ndarray): the updated state, same array as state
+    """
 
+    half = len(axes) // 2
+    index_x = [slice(None)] * state.ndim
+    index_y = [slice(None)] * state.ndim
+    for k, axis in enumerate(axes):
+        index_x[axis] = int(k >= half)
+        index_y[axis] = int(k < half)
+    index_x, index_y = tuple(index_x), tuple(index_y)
 
-dev = qml.device("default.qubit", wires=6)
+    c, s = np.cos(gamma / 2), np.sin(gamma / 2)
+    amplitude_x = state[index_x].copy()
+    amplitude_y = state[index_y]
+    state[index_x] = c * amplitude_x - s * amplitude_y
+    state[index_y] = s * amplitude_x + c * amplitude_y
 
+    return state
+
+
+class SparseExcitationQubit(DefaultQubit):
+    """default.qubit device that applies `MultiExcitation` without building its matrix.
+
+    It has no backpropagation device to hand circuits over to, which default.qubit.autograd would be and which
+    does not support `MultiExcitation`, so gradients are obtained with the parameter-shift rule.
+    """
 
-@qml.qnode(dev)
+    operations = DefaultQubit.operations | {"MultiExcitation"}
+
+    @classmethod
+    def capabilities(cls):
+        capabilities = super().capabilities().copy()
+        capabilities.pop("passthru_devices", None)
+        return capabilities
+
+    def _apply_operation(self, state, operation):
+        if isinstance(operation, MultiExcitation):
+            (gamma,) = operation.parameters
+            if operation.inverse:
+                gamma = -gamma
+            return apply_multi_excitation(state, gamma, self.wires.indices(operation.wires))
+
+        return super()._apply_operation(state, operation)
+
+
+dev = SparseExcitationQubit(wires=6)
+
+
+@qml.qnode(dev, diff_method="parameter-shift")
 def circuit(angles):
     """Prepares the quantum state in the problem statement and returns qml.probs
 
@@ -65,15 +154,17 @@ def circuit(angles):
     alpha, beta, gamma = angles
 
     # QHACK #
-    qml.PauliX(wires=[2])
-    qml.PauliX(wires=[4])
-    qml.PauliX(wires=[5])
+    # |111000> -> cos(alpha / 2)|111000> - sin(alpha / 2)|011001>
+    qml.PauliX(wires=0)
+    qml.PauliX(wires=1)
+    qml.PauliX(wires=2)
+    qml.SingleExcitation(alpha, wires=[0, 5])
 
-    qml.SingleExcitation(-alpha, wires=[1, 4])
+    # |111000> -> cos(beta / 2)|111000> - sin(beta / 2)|001011>, |011001> is left alone
     qml.DoubleExcitation(beta, wires=[0, 1, 4, 5])
-    qml.QubitUnitary(
-        triple_excitation_matrix(gamma / 8), wires=[0, 1, 2, 3, 4, 5]
-    )
+
+    # |111000> -> cos(gamma / 2)|111000> - sin(gamma / 2)|000111>
+    MultiExcitation(gamma, wires=[0, 1, 2, 3, 4, 5])
     # QHACK #
 
     return qml.probs(wires=range(NUM_WIRES))
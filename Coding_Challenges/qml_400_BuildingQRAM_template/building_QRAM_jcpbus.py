@@ -0,0 +1,242 @@
+#! /usr/bin/python3
+
+import sys
+from pennylane import numpy as np
+import pennylane as qml
+
+
+def walsh_hadamard(values):
+    """Unnormalized Walsh-Hadamard transform: entry g of the result is sum_x (-1)^popcount(x & g) values[x].
+
+    Args:
+        - values (np.ndarray): 2^k numbers
+
+    Returns:
+        - (np.ndarray): transformed values, same shape
+    """
+
+    k = int(np.log2(len(values)))
+    values = np.reshape(values, (2,) * k)
+    for axis in range(k):
+        a, b = np.take(values, 0, axis=axis), np.take(values, 1, axis=axis)
+        values = np.stack([a + b, a - b], axis=axis)
+
+    return np.reshape(values, -1)
+
+
+def gray_code_angles(thetas):
+    """Angles of the single qubit rotations of the Gray code decomposition of a uniformly controlled RY.
+
+    Before rotation i, the CNOTs have flipped the target by the parity of the address bits in the Gray code
+    g_i = i ^ (i >> 1), which turns RY(phi_i) into RY(-phi_i). Address x therefore gets the rotation
+    sum_i (-1)^popcount(x & g_i) phi_i, which is inverted by a Walsh-Hadamard transform.
+
+    Args:
+        - thetas (list(float)): 2^k angles, one per address, the first control being the most significant bit
+
+    Returns:
+        - (np.ndarray): 2^k angles, in the order in which they are applied
+    """
+
+    n = len(thetas)
+    gray = np.arange(n) ^ (np.arange(n) >> 1)
+
+    return walsh_hadamard(np.array(thetas))[gray] / n
+
+
+def gray_code_controls(k):
+    """Control of the CNOT following every rotation: the address bit in which consecutive Gray codes differ.
+
+    Args:
+        - k (int): number of address bits
+
+    Returns:
+        - (list(int)): for every rotation, the position of the address bit, 0 being the most significant
+    """
+
+    if k == 0:
+        return []
+
+    steps = np.arange(1, 2 ** k)
+    # bit in which g_i and g_(i + 1) differ is the lowest set bit of i + 1, the last CNOT closes the cycle
+    lowest_bit = np.log2(steps & -steps).astype(int)
+
+    return [k - 1 - int(bit) for bit in lowest_bit] + [0]
+
+
+def uniformly_controlled_ry(thetas, control_wires, target_wire):
+    """Rotates the target by RY(thetas[x]) when the controls hold the address x, with 2^k RY and 2^k CNOT gates.
+
+    Args:
+        - thetas (list(float)): 2^k angles, the first control being the most significant bit of the address
+        - control_wires (list(int)): k address wires
+        - target_wire (int): rotated wire
+    """
+
+    control_wires = list(control_wires)
+    if not control_wires:
+        qml.RY(thetas[0], wires=target_wire)
+        return
+
+    for phi, control in zip(gray_code_angles(thetas), gray_code_controls(len(control_wires))):
+        qml.RY(phi, wires=target_wire)
+        qml.CNOT(wires=[control_wires[control], target_wire])
+
+
+def controlled_ry(theta, control_wires, target_wire):
+    """RY(theta) on the target when every control is 1, with one- and two-qubit rotations, CNOTs and
+    `qml.MultiControlledX` gates only (Barenco et al., Lemma 7.9, with RY in place of the square root of U).
+
+    The multi-controlled X gates borrow the target as a work wire and expand to Toffoli and CNOT gates,
+    a single control is a plain CNOT.
+
+    Args:
+        - theta (float): rotation angle
+        - control_wires (list(int)): control wires
+        - target_wire (int): rotated wire
+    """
+
+    control_wires = list(control_wires)
+    if not control_wires:
+        qml.RY(theta, wires=target_wire)
+        return
+
+    if len(control_wires) == 1:
+        qml.RY(theta / 2, wires=target_wire)
+        qml.CNOT(wires=[control_wires[0], target_wire])
+        qml.RY(-theta / 2, wires=target_wire)
+        qml.CNOT(wires=[control_wires[0], target_wire])
+        return
+
+    # the last control alone turns by theta / 2 and undoes it unless the others flip it, which they do
+    # when they are all 1, in which case the last step adds the missing theta / 2
+    *others, last = control_wires
+
+    def flip_last():
+        if len(others) == 1:
+            qml.CNOT(wires=[others[0], last])
+        else:
+            qml.MultiControlledX(control_wires=others, wires=last, work_wires=[target_wire])
+
+    controlled_ry(theta / 2, [last], target_wire)
+    flip_last()
+    controlled_ry(-theta / 2, [last], target_wire)
+    flip_last()
+    controlled_ry(theta / 2, others, target_wire)
+
+
+def naive_uniformly_controlled_ry(thetas, control_wires, target_wire, decomposed=False):
+    """Same operation as `uniformly_controlled_ry`, with one fully controlled RY per address.
+
+    Args:
+        - thetas (list(float)): 2^k angles, the first control being the most significant bit of the address
+        - control_wires (list(int)): k address wires
+        - target_wire (int): rotated wire
+        - decomposed (bool): apply every controlled RY as `controlled_ry` between X gates on the controls
+        that must be 0, instead of as a single `qml.ControlledQubitUnitary`
+    """
+
+    control_wires = list(control_wires)
+    k = len(control_wires)
+    if not control_wires:
+        qml.RY(thetas[0], wires=target_wire)
+        return
+
+    for address, theta in enumerate(thetas):
+        bits = np.binary_repr(address, k)
+        if not decomposed:
+            qml.ControlledQubitUnitary(
+                qml.RY(theta, wires=target_wire, do_queue=False).matrix,
+                control_wires=control_wires,
+                wires=target_wire,
+                control_values=bits,
+            )
+            continue
+
+        flipped = [wire for wire, bit in zip(control_wires, bits) if bit == "0"]
+        for wire in flipped:
+            qml.PauliX(wires=wire)
+        controlled_ry(theta, control_wires, target_wire)
+        for wire in flipped:
+            qml.PauliX(wires=wire)
+
+
+QRAM_CONSTRUCTIONS = {"gray": uniformly_controlled_ry, "naive": naive_uniformly_controlled_ry}
+
+
+def qram_circuit(thetas, wires, construction="gray"):
+    """Loads 2^k angles: uniform superposition of the k index wires, then a uniformly controlled RY on the last wire.
+
+    Args:
+        - thetas (list(float)): 2^k angles
+        - wires (list(int)): k index wires followed by the rotated wire
+        - construction (str): "gray" or "naive", see `QRAM_CONSTRUCTIONS`
+    """
+
+    wires = list(wires)
+    for wire in wires[:-1]:
+        qml.Hadamard(wires=wire)
+    QRAM_CONSTRUCTIONS[construction](thetas, wires[:-1], wires[-1])
+
+
+def qram_state(thetas, construction="gray"):
+    """qRAM state of an arbitrary table of 2^k angles.
+
+    Args:
+        - thetas (list(float)): 2^k angles
+        - construction (str): "gray" or "naive", see `QRAM_CONSTRUCTIONS`
+
+    Returns:
+        - (list(complex)): final state on k + 1 wires.
+    """
+
+    n_wires = int(np.log2(len(thetas))) + 1
+    dev = qml.device("default.qubit", wires=range(n_wires))
+
+    @qml.qnode(dev)
+    def circuit():
+        qram_circuit(thetas, range(n_wires), construction)
+        return qml.state()
+
+    return circuit()
+
+
+def qRAM(thetas):
+    """Function that generates the superposition state explained above given the thetas angles.
+
+    Args:
+        - thetas (list(float)): list of angles to apply in the rotations.
+
+    Returns:
+        - (list(complex)): final state.
+    """
+
+    # QHACK #
+
+    # QHACK #
+
+    dev = qml.device("default.qubit", wires=range(4))
+
+    @qml.qnode(dev)
+    def circuit():
+
+        # QHACK #
+
+        # Create your circuit: the first three qubits will refer to the index, the fourth to the RY rotation.
+        qram_circuit(thetas, wires=range(4))
+
+        # QHACK #
+
+        return qml.state()
+
+    return circuit()
+
+
+if __name__ == "__main__":
+    # DO NOT MODIFY anything in this code block
+    inputs = sys.stdin.read().split(",")
+    thetas = np.array(inputs, dtype=float)
+
+    output = qRAM(thetas)
+    output = [float(i.real.round(6)) for i in output]
+    print(*output, sep=",")
@@ -0,0 +1,144 @@
+#! /usr/bin/python3
+
+"""Compares the Gray code and the naive qRAM constructions: gate counts, circuit depth and simulation time.
+
+Both circuits are counted once expanded to one- and two-qubit gates: the naive construction applies every
+fully controlled RY as `controlled_ry` between X gates. The naive circuit has too many gates to be built
+as a tape for large k, but its blocks only differ by their X gates, so it is counted from a single expanded
+controlled RY. For simulation, default.qubit applies the naive construction as dense matrices on all k + 1
+wires, so it is only timed up to --max-naive-simulation address bits.
+
+Usage:
+    python qram_benchmark.py [--max-k 12] [--max-naive-simulation 8] [--seed 0]
+"""
+
+import argparse
+import sys
+import time
+
+import pennylane as qml
+from pennylane import numpy as np
+
+from building_QRAM_jcpbus import QRAM_CONSTRUCTIONS, controlled_ry, qram_circuit, qram_state
+
+
+def expanded_wires(qfunc, *args):
+    """Records a quantum function and expands it to one- and two-qubit gates.
+
+    Args:
+        - qfunc (function): quantum function
+        - args: its arguments
+
+    Returns:
+        - (list(str)): name of every gate
+        - (list(list(int))): wires of every gate
+    """
+
+    with qml.tape.QuantumTape() as tape:
+        qfunc(*args)
+    tape = tape.expand(depth=50, stop_at=lambda op: len(op.wires) <= 2)
+
+    return [op.name for op in tape.operations], [op.wires.tolist() for op in tape.operations]
+
+
+def layer(levels, gate_wires):
+    """Pushes the depth reached on every wire through a sequence of gates, each gate starting after
+    the last gate on any of its wires.
+
+    Args:
+        - levels (np.ndarray): depth reached on every wire, along the last axis
+        - gate_wires (list(list(int))): wires of every gate
+
+    Returns:
+        - (np.ndarray): depth reached on every wire after the gates
+    """
+
+    levels = np.array(levels, dtype=float, requires_grad=False)
+    for wires in gate_wires:
+        levels[..., wires] = np.max(levels[..., wires], axis=-1, keepdims=True) + 1
+
+    return levels
+
+
+def gray_stats(k):
+    """Gate count, CNOT count and depth of the expanded Gray code qRAM on k address bits."""
+
+    names, gate_wires = expanded_wires(qram_circuit, np.zeros(2 ** k), range(k + 1), "gray")
+
+    return {
+        "gates": len(names),
+        "cnots": names.count("CNOT"),
+        "depth": int(np.max(layer(np.zeros(k + 1), gate_wires))),
+    }
+
+
+def naive_stats(k):
+    """Gate count, CNOT count and depth of the expanded naive qRAM on k address bits.
+
+    Every block is X gates on the controls that must be 0, the expanded `controlled_ry` and the same X gates.
+    The longest path between any two wires through `controlled_ry` is computed once, and the depth of the
+    whole circuit follows by composing it block after block (a max-plus product).
+    """
+
+    names, gate_wires = expanded_wires(controlled_ry, 0.1, range(k), k)
+
+    # paths[u, w]: number of gates on the longest path entering on wire u and leaving on wire w
+    start = np.where(np.eye(k + 1, dtype=bool), 0.0, -np.inf)
+    paths = layer(start, gate_wires)
+
+    # Hadamard gates on the address wires
+    levels = np.array([1.0] * k + [0.0], requires_grad=False)
+    flips = 0
+    for address in range(2 ** k):
+        flipped = [i for i, bit in enumerate(np.binary_repr(address, k)) if bit == "0"]
+        flips += 2 * len(flipped)
+        levels[flipped] += 1
+        levels = np.max(levels[:, None] + paths, axis=0)
+        levels[flipped] += 1
+
+    return {
+        "gates": k + 2 ** k * len(names) + flips,
+        "cnots": 2 ** k * names.count("CNOT"),
+        "depth": int(np.max(levels)),
+    }
+
+
+STATS = {"gray": gray_stats, "naive": naive_stats}
+
+
+def simulation_time(thetas, construction):
+    """Wall time of one default.qubit simulation of a qRAM circuit, in seconds."""
+
+    start = time.perf_counter()
+    qram_state(thetas, construction)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-k", type=int, default=12, help="largest number of address bits")
+    parser.add_argument(
+        "--max-naive-simulation", type=int, default=8, help="largest number of address bits simulated naively"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'k':>3} {'construction':>12} {'gates':>10} {'cnots':>10} {'depth':>10} {'time (s)':>9}")
+    for k in range(1, args.max_k + 1):
+        thetas = rng.uniform(0, 2 * np.pi, 2 ** k)
+        for construction in QRAM_CONSTRUCTIONS:
+            stats = STATS[construction](k)
+            if construction == "naive" and k > args.max_naive_simulation:
+                timing = "-"
+            else:
+                timing = f"{simulation_time(thetas, construction):.3f}"
+            print(
+                f"{k:>3} {construction:>12} {stats['gates']:>10} {stats['cnots']:>10} {stats['depth']:>10} {timing:>9}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
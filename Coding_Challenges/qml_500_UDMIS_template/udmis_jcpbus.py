@@ -0,0 +1,421 @@
+#! /usr/bin/python3
+
+import os
+import sys
+import time
+import pennylane as qml
+from pennylane import numpy as np
+
+
+def hamiltonian_coeffs_and_obs(graph):
+    """Creates an ordered list of coefficients and observables used to construct
+    the UDMIS Hamiltonian.
+
+    Args:
+        - graph (list((float, float))): A list of x,y coordinates. e.g. graph = [(1.0, 1.1), (4.5, 3.1)]
+
+    Returns:
+        - coeffs (list): List of coefficients for elementary parts of the UDMIS Hamiltonian
+        - obs (list(qml.ops)): List of qml.ops
+    """
+
+    num_vertices = len(graph)
+    pairs = edge_list(graph)
+    num_edges = len(pairs)
+    u = 1.35
+    obs = []
+    coeffs = []
+
+    # QHACK #
+
+    # H = -sum_i n_i + u sum_(i,j) n_i n_j with n_i = (1 - Z_i) / 2, expanded in Z and ZZ terms
+    degrees = np.bincount(np.reshape(pairs, -1), minlength=num_vertices)
+    for i in range(num_vertices):
+        coeffs.append(0.5 - u / 4 * degrees[i])
+        obs.append(qml.PauliZ(i))
+
+    for i, j in pairs:
+        coeffs.append(u / 4)
+        obs.append(qml.PauliZ(int(i)) @ qml.PauliZ(int(j)))
+
+    coeffs.append(-num_vertices / 2 + u / 4 * num_edges)
+    obs.append(qml.Identity(0))
+
+    # QHACK #
+
+    return coeffs, obs
+
+
+def edges(graph):
+    """Creates a matrix of bools that are interpreted as the existence/non-existence (True/False)
+    of edges between vertices (i,j).
+
+    Args:
+        - graph (list((float, float))): A list of x,y coordinates. e.g. graph = [(1.0, 1.1), (4.5, 3.1)]
+
+    Returns:
+        - num_edges (int): The total number of edges in the graph
+        - E (np.ndarray): A Matrix of edges
+    """
+
+    # DO NOT MODIFY anything in this code block
+    num_vertices = len(graph)
+    E = np.zeros((num_vertices, num_vertices), dtype=bool)
+    for vertex_i in range(num_vertices - 1):
+        xi, yi = graph[vertex_i]  # coordinates
+
+        for vertex_j in range(vertex_i + 1, num_vertices):
+            xj, yj = graph[vertex_j]  # coordinates
+            dij = np.sqrt((xi - xj) ** 2 + (yi - yj) ** 2)
+            E[vertex_i, vertex_j] = 1 if dij <= 1.0 else 0
+
+    return E, np.sum(E, axis=(0, 1))
+
+
+def edge_list(graph, radius=1.0):
+    """Same edges as `edges`, found with a uniform grid of cells of side radius instead of testing every pair:
+    two vertices closer than radius always lie in the same or in adjacent cells.
+
+    Args:
+        - graph (list((float, float))): A list of x,y coordinates. e.g. graph = [(1.0, 1.1), (4.5, 3.1)]
+        - radius (float): The largest distance between two connected vertices
+
+    Returns:
+        - (np.ndarray): An array of shape (num_edges, 2) of vertex pairs (i, j) with i < j, in lexicographic order
+    """
+
+    points = np.array(graph, dtype=float, requires_grad=False).reshape(-1, 2)
+    num_vertices = len(points)
+    if num_vertices < 2:
+        return np.zeros((0, 2), dtype=int, requires_grad=False)
+
+    # slightly larger cells keep rounding in the division from pushing neighbours two cells apart
+    cells = np.floor(points / (radius * (1 + 1e-9))).astype(int)
+    cells -= np.min(cells, axis=0) - 1
+    width = np.max(cells[:, 1]) + 2
+    keys = cells[:, 0] * width + cells[:, 1]
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    pairs = []
+    # the cell itself plus half of its neighbours, so that every pair of cells is visited once
+    for dx, dy in [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]:
+        neighbour_keys = sorted_keys + dx * width + dy
+        start = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+        stop = np.searchsorted(sorted_keys, neighbour_keys, side="right")
+        counts = stop - start
+
+        # every (position in sorted order, candidate position in the neighbouring cell)
+        first = np.repeat(np.arange(num_vertices), counts)
+        offsets = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = np.repeat(start, counts) + offsets
+        if dx == 0 and dy == 0:
+            keep = first < second
+            first, second = first[keep], second[keep]
+
+        i, j = order[first], order[second]
+        xi, yi = points[i, 0], points[i, 1]
+        xj, yj = points[j, 0], points[j, 1]
+        dij = np.sqrt((xi - xj) ** 2 + (yi - yj) ** 2)
+        close = dij <= radius
+        pairs.append(np.stack([np.minimum(i, j)[close], np.maximum(i, j)[close]], axis=1))
+
+    pairs = np.concatenate(pairs)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def edges_grid(graph, radius=1.0):
+    """Drop-in replacement for `edges` built on `edge_list`.
+
+    Args:
+        - graph (list((float, float))): A list of x,y coordinates. e.g. graph = [(1.0, 1.1), (4.5, 3.1)]
+        - radius (float): The largest distance between two connected vertices
+
+    Returns:
+        - E (np.ndarray): A Matrix of edges
+        - num_edges (int): The total number of edges in the graph
+    """
+
+    num_vertices = len(graph)
+    pairs = edge_list(graph, radius)
+
+    E = np.zeros((num_vertices, num_vertices), dtype=bool, requires_grad=False)
+    E[pairs[:, 0], pairs[:, 1]] = True
+
+    return E, len(pairs)
+
+
+def variational_circuit(params, num_vertices):
+    """A variational circuit.
+
+    Args:
+        - params (np.ndarray): your variational parameters
+        - num_vertices (int): The number of vertices in the graph. Also used for number of wires.
+    """
+
+    # QHACK #
+
+    # The ground state is a computational basis state: RY layers reach it, the CNOTs help
+    # to move away from maximal but not maximum independent sets.
+    for layer in range(len(params)):
+        for wire in range(num_vertices):
+            qml.RY(params[layer, wire], wires=wire)
+        if layer < len(params) - 1:
+            for wire in range(num_vertices - 1):
+                qml.CNOT(wires=[wire, wire + 1])
+
+    # QHACK #
+
+
+def hamiltonian_diagonal(H, num_wires):
+    """Diagonal of a Hamiltonian in the computational basis, when it only contains Z, ZZ, ... and identity terms.
+
+    Args:
+        - H (qml.Hamiltonian): The Hamiltonian, acting on wires 0 to num_wires - 1
+        - num_wires (int): The number of wires
+
+    Returns:
+        - (np.ndarray): The 2**num_wires diagonal entries, or None if H is not diagonal in the computational basis
+    """
+
+    # z[k, w] is the eigenvalue of PauliZ on wire w for the basis state k
+    bits = (np.arange(2 ** num_wires)[:, None] >> np.arange(num_wires - 1, -1, -1)) & 1
+    z = 1 - 2 * bits
+
+    diagonal = np.zeros(2 ** num_wires, requires_grad=False)
+    for coeff, op in zip(H.coeffs, H.ops):
+        factors = op.obs if isinstance(op, qml.operation.Tensor) else [op]
+        term = np.ones(2 ** num_wires)
+        for factor in factors:
+            if factor.name == "PauliZ":
+                term = term * z[:, factor.wires[0]]
+            elif factor.name != "Identity":
+                return None
+        diagonal = diagonal + float(coeff) * term
+
+    return diagonal
+
+
+def energy_cost(num_vertices, H, dev):
+    """The energy expectation value of H for the variational circuit, as a differentiable function of the parameters.
+
+    The UDMIS Hamiltonian is diagonal: its diagonal is then precomputed once, and the energy is
+    a single dot product with the probabilities instead of one expectation value per term.
+
+    Args:
+        - num_vertices (int): The number of vertices/wires in the graph
+        - H (qml.Hamiltonian): The result of qml.Hamiltonian(coeffs, obs)
+        - dev (qml.Device): The device to run the circuit on
+
+    Returns:
+        - (function): The cost function of the parameters
+    """
+
+    diagonal = hamiltonian_diagonal(H, num_vertices)
+    if diagonal is None:
+
+        @qml.qnode(dev)
+        def cost(params):
+            variational_circuit(params, num_vertices)
+            return qml.expval(H)
+
+        return cost
+
+    @qml.qnode(dev)
+    def probs(params):
+        variational_circuit(params, num_vertices)
+        return qml.probs(wires=range(num_vertices))
+
+    def cost(params):
+        return np.dot(probs(params), diagonal)
+
+    return cost
+
+
+def train_circuit(num_vertices, H):
+    """Trains a quantum circuit to learn the ground state of the UDMIS Hamiltonian.
+
+    Args:
+        - num_vertices (int): The number of vertices/wires in the graph
+        - H (qml.Hamiltonian): The result of qml.Hamiltonian(coeffs, obs)
+
+    Returns:
+        - E / num_vertices (float): The ground state energy density.
+    """
+
+    dev = qml.device("default.qubit", wires=num_vertices)
+
+    @qml.qnode(dev)
+    def cost(params):
+        """The energy expectation value of a Hamiltonian"""
+        variational_circuit(params, num_vertices)
+        return qml.expval(H)
+
+    # QHACK #
+
+    # define your trainable parameters and optimizer here
+    # change the number of training iterations, `epochs`, if you want to
+    # just be aware of the 80s time limit!
+
+    np.random.seed(0)
+    params = np.random.uniform(0, np.pi, (2, num_vertices), requires_grad=True)
+    opt = qml.AdamOptimizer(stepsize=0.1)
+
+    epochs = 200
+
+    cost = energy_cost(num_vertices, H, dev)
+
+    # QHACK #
+
+    for i in range(epochs):
+        params, E = opt.step_and_cost(cost, params)
+
+    return E / float(num_vertices)
+
+
+def save_checkpoint(path, params, best, epoch, stale=0, opt=None):
+    """Writes the training state to disk, replacing any previous checkpoint atomically.
+
+    Args:
+        - path (str): The checkpoint file
+        - params (np.ndarray): The variational parameters
+        - best (float): The lowest energy seen so far, against which improvements are measured
+        - epoch (int): The number of epochs trained so far
+        - stale (int): The number of epochs since the last improvement
+        - opt (qml.AdamOptimizer): The optimizer, whose moments and step count are saved too
+    """
+
+    state = {"params": params, "best": best, "epoch": epoch, "stale": stale, "t": 0}
+    if opt is not None and opt.accumulation is not None:
+        state.update(fm=np.array(opt.fm[0]), sm=np.array(opt.sm[0]), t=opt.t)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **state)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, opt=None):
+    """Reads a training state written by `save_checkpoint`.
+
+    Args:
+        - path (str): The checkpoint file
+        - opt (qml.AdamOptimizer): The optimizer to restore the moments and step count of
+
+    Returns:
+        - params (np.ndarray): The variational parameters
+        - best (float): The lowest energy seen so far
+        - epoch (int): The number of epochs trained so far
+        - stale (int): The number of epochs since the last improvement
+    """
+
+    with np.load(path) as checkpoint:
+        params = np.array(checkpoint["params"], requires_grad=True)
+        if opt is not None:
+            opt.reset()
+            if int(checkpoint["t"]) > 0:
+                opt.accumulation = {
+                    "fm": [list(checkpoint["fm"])],
+                    "sm": [list(checkpoint["sm"])],
+                    "t": int(checkpoint["t"]),
+                }
+        return params, float(checkpoint["best"]), int(checkpoint["epoch"]), int(checkpoint["stale"])
+
+
+def train_circuit_budgeted(
+    num_vertices,
+    H,
+    time_budget=70.0,
+    tol=1e-6,
+    patience=20,
+    max_epochs=None,
+    checkpoint=None,
+    checkpoint_every=50,
+):
+    """Trains the same circuit as `train_circuit`, but until a wall-clock budget is spent or the energy
+    stops improving, instead of for a fixed number of epochs. The state can be checkpointed to disk
+    and training resumes from an existing checkpoint.
+
+    Args:
+        - num_vertices (int): The number of vertices/wires in the graph
+        - H (qml.Hamiltonian): The result of qml.Hamiltonian(coeffs, obs)
+        - time_budget (float): Wall-clock budget in seconds, an epoch is only started if it should fit
+        - tol (float): The smallest decrease of the energy that counts as an improvement
+        - patience (int): The number of epochs without improvement before stopping
+        - max_epochs (int): The total number of epochs after which to stop, counting the resumed ones
+        - checkpoint (str): The checkpoint file, or None to train in memory only
+        - checkpoint_every (int): The number of epochs between two checkpoints
+
+    Returns:
+        - E / num_vertices (float): The ground state energy density.
+        - (dict): The number of epochs run, total and in this call, epochs per second and why training stopped
+    """
+
+    start = time.perf_counter()
+
+    dev = qml.device("default.qubit", wires=num_vertices)
+    cost = energy_cost(num_vertices, H, dev)
+    opt = qml.AdamOptimizer(stepsize=0.1)
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        params, best, epoch, stale = load_checkpoint(checkpoint, opt)
+    else:
+        np.random.seed(0)
+        params = np.random.uniform(0, np.pi, (2, num_vertices), requires_grad=True)
+        best, epoch, stale = float("inf"), 0, 0
+
+    first_epoch = epoch
+    reason = "max_epochs"
+    while max_epochs is None or epoch < max_epochs:
+        elapsed = time.perf_counter() - start
+        if epoch > first_epoch and elapsed + elapsed / (epoch - first_epoch) > time_budget:
+            reason = "time_budget"
+            break
+
+        params, E = opt.step_and_cost(cost, params)
+        epoch += 1
+
+        if E < best - tol:
+            stale = 0
+        else:
+            stale += 1
+        best = min(best, float(E))
+
+        if checkpoint is not None and epoch % checkpoint_every == 0:
+            save_checkpoint(checkpoint, params, best, epoch, stale, opt)
+
+        if stale >= patience:
+            reason = "converged"
+            break
+
+    E = float(cost(params))
+    if checkpoint is not None:
+        save_checkpoint(checkpoint, params, best, epoch, stale, opt)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "epochs": epoch,
+        "new_epochs": epoch - first_epoch,
+        "epochs_per_second": (epoch - first_epoch) / elapsed,
+        "stopped": reason,
+    }
+
+    return E / float(num_vertices), stats
+
+
+if __name__ == "__main__":
+    # DO NOT MODIFY anything in this code block
+    inputs = np.array(sys.stdin.read().split(","), dtype=float, requires_grad=False)
+    num_vertices = int(len(inputs) / 2)
+    x = inputs[:num_vertices]
+    y = inputs[num_vertices:]
+    graph = []
+    for n in range(num_vertices):
+        graph.append((x[n].item(), y[n].item()))
+
+    coeffs, obs = hamiltonian_coeffs_and_obs(graph)
+    H = qml.Hamiltonian(coeffs, obs)
+
+    energy_density = train_circuit(num_vertices, H)
+    print(f"{energy_density:.6f}")
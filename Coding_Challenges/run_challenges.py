@@ -0,0 +1,426 @@
+#! /usr/bin/python3
+
+"""Runs every challenge solution against its numbered ``N.in`` / ``N.ans`` fixtures.
+
+Each fixture is piped into its solution script via ``stdin`` exactly as the judging
+system does, on a process pool sized to the number of cores. A single JSON report
+with the verdict, wall time and peak resident memory of every run is written at the end.
+
+Usage:
+    python run_challenges.py [challenge_dir ...] [--report FILE] [--timeout SECONDS]
+"""
+
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import runpy
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# The judging system kills any submission that runs for longer than this.
+TIME_LIMIT = 80.0
+
+# Filled-in solutions live next to the templates under these suffixes.
+SOLUTION_SUFFIXES = ("_jcpbus.py", "_jbus.py")
+
+# os.waitid and os.wait4 only exist on POSIX systems, elsewhere runs are waited for with Popen.wait
+HAS_WAIT4 = hasattr(os, "waitid") and hasattr(os, "wait4")
+
+
+def find_challenges(root=ROOT):
+    """Finds every challenge directory below root.
+
+    Args:
+        - root (pathlib.Path): folder holding the ``<category>_<points>_<name>_template`` directories
+
+    Returns:
+        - (list(pathlib.Path)): challenge directories, sorted by name
+    """
+
+    return sorted(p for p in root.iterdir() if p.is_dir() and p.name.endswith("_template"))
+
+
+def solution_script(challenge):
+    """Picks the script to judge for a challenge: a filled-in solution if there is one,
+    the bare template otherwise.
+
+    Args:
+        - challenge (pathlib.Path): challenge directory
+
+    Returns:
+        - (pathlib.Path): script to run, or None if the directory holds no Python file
+    """
+
+    scripts = sorted(challenge.glob("*.py"))
+    for suffix in SOLUTION_SUFFIXES:
+        for script in scripts:
+            if script.name.endswith(suffix):
+                return script
+
+    for script in scripts:
+        if script.name.endswith("_template.py"):
+            return script
+
+    return None
+
+
+def find_fixtures(challenge):
+    """Lists the input/answer pairs of a challenge.
+
+    Args:
+        - challenge (pathlib.Path): challenge directory
+
+    Returns:
+        - (list((pathlib.Path, pathlib.Path))): (N.in, N.ans) pairs sorted by N
+    """
+
+    fixtures = []
+    for fixture_in in challenge.glob("*.in"):
+        fixture_ans = fixture_in.with_suffix(".ans")
+        if fixture_in.stem.isdigit() and fixture_ans.exists():
+            fixtures.append((fixture_in, fixture_ans))
+
+    return sorted(fixtures, key=lambda pair: int(pair[0].stem))
+
+
+def outputs_match(output, expected, rtol=1e-2, atol=1e-6):
+    """Compares a script output with the expected answer the way the judging system does:
+    comma-separated numbers within a relative tolerance, anything else exactly.
+
+    Args:
+        - output (str): what the solution printed
+        - expected (str): contents of the ``.ans`` file
+        - rtol (float): relative tolerance for floating point values
+        - atol (float): absolute tolerance, only relevant for expected values close to zero
+
+    Returns:
+        - (bool): True if the output is accepted
+    """
+
+    got = [token.strip() for token in output.strip().split(",")]
+    want = [token.strip() for token in expected.strip().split(",")]
+    if len(got) != len(want):
+        return False
+
+    for g, w in zip(got, want):
+        if g == w:
+            continue
+        try:
+            g_value, w_value = float(g), float(w)
+        except ValueError:
+            return False
+        if not math.isclose(g_value, w_value, rel_tol=rtol, abs_tol=atol):
+            return False
+
+    return True
+
+
+def labels_match(output, expected, min_accuracy=0.9):
+    """Compares predicted labels with the true ones the way classification challenges are judged:
+    the predictions only need to be accurate enough, not identical.
+
+    Args:
+        - output (str): comma-separated labels printed by the solution
+        - expected (str): contents of the ``.ans`` file, the true labels
+        - min_accuracy (float): smallest accepted fraction of correct labels
+
+    Returns:
+        - (bool): True if the output is accepted
+    """
+
+    got = [token.strip() for token in output.strip().split(",")]
+    want = [token.strip() for token in expected.strip().split(",")]
+    if len(got) != len(want):
+        return False
+
+    return sum(g == w for g, w in zip(got, want)) > min_accuracy * len(want)
+
+
+# Challenges not judged by `outputs_match`, keyed by directory name.
+COMPARATORS = {
+    "qml_300_IsingOnTheCake_template": labels_match,
+}
+
+
+def preload():
+    """Pool initializer of the preloaded mode: imports PennyLane and fills its device
+    registry once, so that every fixture forked from this worker starts warm."""
+
+    import pennylane as qml
+    from pennylane import numpy as np  # noqa: F401
+
+    qml.device("default.qubit", wires=1)
+
+
+def fork_script(script, stdin, stdout, stderr):
+    """Runs a script's ``__main__`` block in a child forked from the current, preloaded process.
+
+    Args:
+        - script (pathlib.Path): solution script
+        - stdin, stdout, stderr (file): open files the child's standard streams are redirected to
+
+    Returns:
+        - (int): pid of the child
+    """
+
+    pid = os.fork()
+    if pid:
+        return pid
+
+    # child: never return into the pool machinery of the parent
+    from pennylane import numpy as np
+
+    code = 1
+    try:
+        for stream, target in ((sys.stdin, stdin), (sys.stdout, stdout), (sys.stderr, stderr)):
+            os.dup2(target.fileno(), stream.fileno())
+        os.chdir(script.parent)
+        sys.argv = [script.name]
+        sys.path[0] = str(script.parent)
+        # forked children share the parent's random state, a fresh interpreter would not
+        np.random.seed()
+        runpy.run_path(script.name, run_name="__main__")
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (e.code is not None)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def wait_child(pid, timeout):
+    """Waits for a child process, killing it once the time budget is spent.
+
+    Args:
+        - pid (int): pid of the child
+        - timeout (float): wall-clock budget in seconds
+
+    Returns:
+        - (int): return code of the child
+        - (int): its peak RSS (KiB)
+        - (bool): whether it was killed for running out of time
+    """
+
+    lock = threading.Lock()
+    finished = False
+    timed_out = False
+
+    def kill():
+        nonlocal timed_out
+        with lock:
+            if not finished:
+                timed_out = True
+                os.kill(pid, signal.SIGKILL)
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    # wait without reaping first, so that the pid cannot be recycled before the timer is disarmed
+    os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+    with lock:
+        finished = True
+    timer.cancel()
+    # wait4 rather than Popen.wait so that we get the rusage of this child alone
+    _, status, rusage = os.wait4(pid, 0)
+
+    return os.waitstatus_to_exitcode(status), rusage.ru_maxrss, timed_out
+
+
+def run_script(script, fixture_in, timeout=TIME_LIMIT, preloaded=False):
+    """Runs a script with a fixture on stdin, killing it once the time budget is spent.
+
+    Args:
+        - script (pathlib.Path): solution script
+        - fixture_in (pathlib.Path): file piped into the script
+        - timeout (float): wall-clock budget in seconds
+        - preloaded (bool): fork the run from the current process instead of starting a new interpreter
+
+    Returns:
+        - (dict): stdout, stderr, return code, wall time (s), peak RSS (KiB, None where os.wait4 is missing)
+        and whether the run timed out
+    """
+
+    with open(fixture_in, "rb") as stdin, tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        if preloaded:
+            pid = fork_script(script, stdin, stdout, stderr)
+        else:
+            process = subprocess.Popen(
+                [sys.executable, script.name], cwd=script.parent, stdin=stdin, stdout=stdout, stderr=stderr
+            )
+            pid = process.pid
+
+        if preloaded or HAS_WAIT4:
+            returncode, peak_rss_kb, timed_out = wait_child(pid, timeout)
+        else:
+            # no wait4 on this platform: no peak memory either
+            timed_out = False
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                process.kill()
+                process.wait()
+            returncode, peak_rss_kb = process.returncode, None
+        wall_time = time.perf_counter() - start
+
+        stdout.seek(0)
+        stderr.seek(0)
+        return {
+            "stdout": stdout.read().decode(errors="replace"),
+            "stderr": stderr.read().decode(errors="replace"),
+            "returncode": returncode,
+            "wall_time": wall_time,
+            "peak_rss_kb": peak_rss_kb,
+            "timed_out": timed_out,
+        }
+
+
+def judge(script, fixture_in, fixture_ans, timeout=TIME_LIMIT, rtol=1e-2, preloaded=False):
+    """Runs one fixture and turns the result into a report entry.
+
+    Args:
+        - script (pathlib.Path): solution script
+        - fixture_in (pathlib.Path): input fixture
+        - fixture_ans (pathlib.Path): expected answer
+        - timeout (float): wall-clock budget in seconds
+        - rtol (float): relative tolerance for floating point answers, challenges in COMPARATORS ignore it
+        - preloaded (bool): fork the run from the current, preloaded process
+
+    Returns:
+        - (dict): report entry for the fixture
+    """
+
+    expected = fixture_ans.read_text()
+    compare_kwargs = {} if script.parent.name in COMPARATORS else {"rtol": rtol}
+    result = run_script(script, fixture_in, timeout, preloaded)
+
+    if result["timed_out"]:
+        status = "timeout"
+    elif result["returncode"] != 0:
+        status = "error"
+    elif COMPARATORS.get(script.parent.name, outputs_match)(result["stdout"], expected, **compare_kwargs):
+        status = "pass"
+    else:
+        status = "fail"
+
+    return {
+        "challenge": script.parent.name,
+        "script": script.name,
+        "fixture": fixture_in.name,
+        "status": status,
+        "passed": status == "pass",
+        "wall_time": round(result["wall_time"], 4),
+        "peak_rss_kb": result["peak_rss_kb"],
+        "output": result["stdout"].strip(),
+        "expected": expected.strip(),
+        "stderr": result["stderr"].strip()[-2000:],
+    }
+
+
+def run_all(challenges, workers=None, timeout=TIME_LIMIT, rtol=1e-2, previous=None, preloaded=False):
+    """Judges every fixture of the given challenges on a process pool.
+
+    Args:
+        - challenges (list(pathlib.Path)): challenge directories
+        - workers (int): pool size, defaults to the number of cores
+        - timeout (float): wall-clock budget per run in seconds
+        - rtol (float): relative tolerance for floating point answers
+        - previous (dict): wall times of an earlier report keyed by (challenge, fixture),
+        used to start the slowest runs first
+        - preloaded (bool): import PennyLane once per worker and fork every run from it,
+        instead of paying a cold interpreter start per fixture
+
+    Returns:
+        - (list(dict)): one report entry per fixture, in challenge and fixture order
+    """
+
+    tasks = []
+    for challenge in challenges:
+        script = solution_script(challenge)
+        if script is None:
+            continue
+        for fixture_in, fixture_ans in find_fixtures(challenge):
+            tasks.append((script, fixture_in, fixture_ans, timeout, rtol, preloaded))
+
+    previous = previous or {}
+
+    def expected_time(task):
+        return previous.get((task[0].parent.name, task[1].name), timeout)
+
+    workers = workers or os.cpu_count() or 1
+    initializer = preload if preloaded else None
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        # longest runs first, so the total is bounded by the slowest one rather than the queue tail
+        futures = {id(task): pool.submit(judge, *task) for task in sorted(tasks, key=expected_time, reverse=True)}
+        return [futures[id(task)].result() for task in tasks]
+
+
+def load_wall_times(report):
+    """Reads the per-fixture wall times of an earlier report.
+
+    Args:
+        - report (pathlib.Path): JSON report written by a previous run
+
+    Returns:
+        - (dict): wall times keyed by (challenge, fixture), empty if there is no usable report
+    """
+
+    try:
+        results = json.loads(report.read_text())["results"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+    return {(r["challenge"], r["fixture"]): r["wall_time"] for r in results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("challenges", nargs="*", type=Path, help="challenge directories (default: all)")
+    parser.add_argument("--report", type=Path, default=Path("challenge_report.json"), help="JSON report to write")
+    parser.add_argument("--timeout", type=float, default=TIME_LIMIT, help="per-run budget in seconds")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: number of cores)")
+    parser.add_argument("--rtol", type=float, default=1e-2, help="relative tolerance for float answers")
+    parser.add_argument(
+        "--preload", action="store_true", help="fork every run from workers that already imported PennyLane"
+    )
+    args = parser.parse_args(argv)
+    if args.preload and not hasattr(os, "fork"):
+        parser.error("--preload needs os.fork, which this platform does not have")
+
+    challenges = [p.resolve() for p in args.challenges] or find_challenges()
+
+    start = time.perf_counter()
+    results = run_all(challenges, args.workers, args.timeout, args.rtol, load_wall_times(args.report), args.preload)
+    wall_time = time.perf_counter() - start
+
+    report = {
+        "wall_time": round(wall_time, 4),
+        "passed": sum(r["passed"] for r in results),
+        "total": len(results),
+        "results": results,
+    }
+    args.report.write_text(json.dumps(report, indent=2) + "\n")
+
+    for r in results:
+        memory = f"{r['peak_rss_kb'] / 1024:8.1f} MiB" if r["peak_rss_kb"] is not None else "       - MiB"
+        print(f"{r['status']:>7}  {r['wall_time']:8.2f}s  {memory}  {r['challenge']}/{r['fixture']}")
+    print(f"{report['passed']}/{report['total']} fixtures passed in {wall_time:.2f}s, report written to {args.report}")
+
+    return 0 if report["passed"] == report["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())